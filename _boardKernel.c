@@ -0,0 +1,198 @@
+/******************************************************************************
+ *  Compiled hot path of board.Board (build it with: python boardKernel.py)
+ *
+ *  fill(blocks, distances, goal_board) -> (linear_board, manhattan, hamming)
+ *      flattens the rows of a board and sums the Manhattan and Hamming
+ *      distances with the lookup tables of board._PackedTables
+ *
+ *  neighbor(linear_board, Idx, nIdx, distances, goal_board, manhattan, hamming)
+ *      -> (linear_board, manhattan, hamming)
+ *      copy of the board with the blank tile (at Idx) moved to nIdx, the
+ *      distances are updated from the only tile that moved
+ *
+ *  The tiles of the new lists are the same int objects of the old ones, so the
+ *  boards are identical to the boards built by the pure Python code.
+ *
+ *  @author Eduardo Ch. Colorado
+ ******************************************************************************/
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+/* distances[tile][idx] without creating Python objects, -1 on error */
+static long
+distance(PyObject *distances, long tile, Py_ssize_t idx)
+{
+    PyObject *row = PyList_GET_ITEM(distances, tile);
+    if (!PyList_Check(row) || idx >= PyList_GET_SIZE(row)) {
+        PyErr_SetString(PyExc_ValueError, "invalid table of distances");
+        return -1;
+    }
+    return PyLong_AsLong(PyList_GET_ITEM(row, idx));
+}
+
+static int
+check_tables(PyObject *distances, PyObject *goal, Py_ssize_t cells)
+{
+    if (!PyList_Check(distances) || !PyList_Check(goal)) {
+        PyErr_SetString(PyExc_TypeError, "the tables must be lists");
+        return -1;
+    }
+    if (PyList_GET_SIZE(distances) != cells || PyList_GET_SIZE(goal) != cells) {
+        PyErr_SetString(PyExc_ValueError, "the tables don't match the board");
+        return -1;
+    }
+    return 0;
+}
+
+static PyObject *
+fill(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+{
+    if (nargs != 3) {
+        PyErr_SetString(PyExc_TypeError, "fill expects 3 arguments");
+        return NULL;
+    }
+    PyObject *blocks = args[0], *distances = args[1], *goal = args[2];
+    PyObject *rows = PySequence_Fast(blocks, "the board must be a list of rows");
+    if (rows == NULL) {
+        return NULL;
+    }
+    Py_ssize_t n = PySequence_Fast_GET_SIZE(rows);
+    if (check_tables(distances, goal, n * n) < 0) {
+        Py_DECREF(rows);
+        return NULL;
+    }
+    PyObject *linear = PyList_New(n * n);
+    if (linear == NULL) {
+        Py_DECREF(rows);
+        return NULL;
+    }
+    long manhattan = 0, hamming = 0;
+    Py_ssize_t idx = 0;
+    for (Py_ssize_t i = 0; i < n; i++) {
+        PyObject *row = PySequence_Fast(PySequence_Fast_GET_ITEM(rows, i),
+                                        "the board must be a list of rows");
+        if (row == NULL) {
+            goto error;
+        }
+        if (PySequence_Fast_GET_SIZE(row) != n) {
+            Py_DECREF(row);
+            PyErr_SetString(PyExc_ValueError, "the board must be square");
+            goto error;
+        }
+        for (Py_ssize_t j = 0; j < n; j++, idx++) {
+            PyObject *item = PySequence_Fast_GET_ITEM(row, j);
+            long tile = PyLong_AsLong(item);
+            if (tile == -1 && PyErr_Occurred()) {
+                Py_DECREF(row);
+                goto error;
+            }
+            if (tile < 0 || tile >= n * n) {
+                Py_DECREF(row);
+                PyErr_Format(PyExc_ValueError, "tile %ld out of range", tile);
+                goto error;
+            }
+            Py_INCREF(item);
+            PyList_SET_ITEM(linear, idx, item);
+            if (tile != 0) {
+                long d = distance(distances, tile, idx);
+                if (d == -1 && PyErr_Occurred()) {
+                    Py_DECREF(row);
+                    goto error;
+                }
+                manhattan += d;
+                long target = PyLong_AsLong(PyList_GET_ITEM(goal, idx));
+                if (target != tile) {
+                    hamming++;
+                }
+            }
+        }
+        Py_DECREF(row);
+    }
+    Py_DECREF(rows);
+    return Py_BuildValue("(Nll)", linear, manhattan, hamming);
+
+error:
+    /* the unset items of the list are NULL, which the list deallocator skips */
+    Py_DECREF(rows);
+    Py_DECREF(linear);
+    return NULL;
+}
+
+static PyObject *
+neighbor(PyObject *self, PyObject *const *args, Py_ssize_t nargs)
+{
+    if (nargs != 7) {
+        PyErr_SetString(PyExc_TypeError, "neighbor expects 7 arguments");
+        return NULL;
+    }
+    PyObject *board = args[0], *distances = args[3], *goal = args[4];
+    if (!PyList_Check(board)) {
+        PyErr_SetString(PyExc_TypeError, "the board must be a list");
+        return NULL;
+    }
+    Py_ssize_t cells = PyList_GET_SIZE(board);
+    if (check_tables(distances, goal, cells) < 0) {
+        return NULL;
+    }
+    Py_ssize_t Idx = PyLong_AsSsize_t(args[1]);
+    Py_ssize_t nIdx = PyLong_AsSsize_t(args[2]);
+    long manhattan = PyLong_AsLong(args[5]);
+    long hamming = PyLong_AsLong(args[6]);
+    if (PyErr_Occurred()) {
+        return NULL;
+    }
+    if (Idx < 0 || Idx >= cells || nIdx < 0 || nIdx >= cells) {
+        PyErr_SetString(PyExc_IndexError, "position out of the board");
+        return NULL;
+    }
+    PyObject *moved = PyList_GET_ITEM(board, nIdx);
+    long tile = PyLong_AsLong(moved);
+    if (tile == -1 && PyErr_Occurred()) {
+        return NULL;
+    }
+    if (tile < 0 || tile >= cells) {
+        PyErr_Format(PyExc_ValueError, "tile %ld out of range", tile);
+        return NULL;
+    }
+    PyObject *linear = PyList_GetSlice(board, 0, cells);
+    if (linear == NULL) {
+        return NULL;
+    }
+    /* the tile at nIdx takes the place of the blank tile */
+    PyObject *blank = PyList_GET_ITEM(linear, Idx);
+    PyList_SET_ITEM(linear, Idx, moved);
+    PyList_SET_ITEM(linear, nIdx, blank);
+    if (tile != 0) {
+        long before = distance(distances, tile, nIdx);
+        long after = distance(distances, tile, Idx);
+        if ((before == -1 || after == -1) && PyErr_Occurred()) {
+            Py_DECREF(linear);
+            return NULL;
+        }
+        manhattan += after - before;
+        hamming += (PyLong_AsLong(PyList_GET_ITEM(goal, Idx)) != tile)
+                   - (PyLong_AsLong(PyList_GET_ITEM(goal, nIdx)) != tile);
+    }
+    return Py_BuildValue("(Nll)", linear, manhattan, hamming);
+}
+
+static PyMethodDef methods[] = {
+    {"fill", (PyCFunction)(void (*)(void))fill, METH_FASTCALL,
+     "fill(blocks, distances, goal_board) -> (linear_board, manhattan, hamming)"},
+    {"neighbor", (PyCFunction)(void (*)(void))neighbor, METH_FASTCALL,
+     "neighbor(linear_board, Idx, nIdx, distances, goal_board, manhattan, "
+     "hamming) -> (linear_board, manhattan, hamming)"},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef module = {
+    PyModuleDef_HEAD_INIT, "_boardKernel",
+    "Compiled hot path of board.Board", -1, methods, NULL, NULL, NULL, NULL,
+};
+
+PyMODINIT_FUNC
+PyInit__boardKernel(void)
+{
+    return PyModule_Create(&module);
+}
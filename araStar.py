@@ -0,0 +1,184 @@
+from heapq import heapify, heappop, heappush
+from math import inf
+from time import perf_counter
+from typing import Iterator, Optional
+
+# *****************************************************************************
+#  Execution:    none
+#  Dependencies: none
+#
+#  Anytime repairing A* (ARA*) for the n-puzzle game.
+#
+#  Weighted A* orders the open list by g + w * h with w > 1, it reaches the goal
+#  expanding far less boards than A* and (with a consistent heuristic) its
+#  solution has at most w times the minimum number of moves. ARA* runs a series
+#  of weighted A* searches with decreasing weights, so a first solution is found
+#  quickly and then it is improved while there is time left:
+#
+#  - the searches share g, the parents and the boards already seen, so each one
+#    only repairs the part of the game tree that changes with the new weight.
+#  - a board whose g improves after it was expanded in the current search is not
+#    expanded again (that keeps the bound of weighted A*), it is kept aside as
+#    inconsistent and goes back to the open list in the next search.
+#  - after each search the solution is at most bound times the optimum, where
+#    bound = min(w, moves / lowest g + h of the open and inconsistent boards).
+#    A bound of 1 means the solution is optimal and the search ends.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+
+class ARAStar(object):
+    """
+    Anytime search from a board, heuristic(board) gives the h value and stats (a
+    SearchStats) receives the counters of the search
+    weight: weight of the first search (at least 1)
+    step:   the weight decreases by step after each search, down to 1
+    """
+
+    def __init__(
+        self,
+        board,
+        heuristic,
+        stats,
+        weight: float = 3.0,
+        step: float = 0.5,
+        on_expand=None,
+        on_generate=None,
+    ):
+        if weight < 1:
+            raise ValueError("the weight of ARA* must be at least 1")
+        if step <= 0:
+            raise ValueError("the step of the weight must be positive")
+        self.board = board
+        self.heuristic = heuristic
+        self.weight = weight
+        self.step = step
+        self.stats = stats
+        self.on_expand = on_expand
+        self.on_generate = on_generate
+        key = board.key()
+        self.boards = {key: board}
+        self.g = {key: 0}
+        self.h = {key: heuristic(board)}
+        self.parent: dict = {key: None}
+        self.heap: list = []  # (g + w * h, h, order, g, key)
+        self.order = 0
+        self.closed: set = set()  # expanded by the current search
+        self.inconsistent: set = set()  # improved after they were expanded
+        self.goal: Optional[bytes] = None  # key of the goal once it is reached
+        self.__push(key)
+
+    def __push(self, key):
+        g, h = self.g[key], self.h[key]
+        heappush(self.heap, (g + self.weight * h, h, self.order, g, key))
+        self.order += 1
+
+    def __improve(self, deadline: float) -> bool:
+        """
+        Weighted A* until no board of the open list can improve the solution,
+        return False when the deadline passes first (never before the first
+        solution is found)
+        """
+        heap, g_of, h_of, parent = self.heap, self.g, self.h, self.parent
+        closed, stats = self.closed, self.stats
+        while len(heap) > 0:
+            priority, h, _, g, key = heap[0]
+            if g != g_of[key] or key in closed:
+                heappop(heap)  # stale entry, the board was improved or expanded
+                continue
+            if self.goal is not None:
+                if g_of[self.goal] <= priority:
+                    return True
+                if stats.expanded % 256 == 0 and perf_counter() > deadline:
+                    return False
+            heappop(heap)
+            board = self.boards[key]
+            if board.is_goal():
+                self.goal = key
+                continue  # the goal is never expanded
+            closed.add(key)
+            stats.expanded += 1
+            stats.layers[g + h] = stats.layers.get(g + h, 0) + 1
+            if self.on_expand is not None:
+                self.on_expand(board, g)
+            for neighbor in board.neighbors():
+                neighbor_key = neighbor.key()
+                known = g_of.get(neighbor_key)
+                if known is not None and known <= g + 1:
+                    stats.duplicates += 1
+                    continue
+                if known is None:
+                    self.boards[neighbor_key] = neighbor
+                    h_of[neighbor_key] = self.heuristic(neighbor)
+                g_of[neighbor_key] = g + 1
+                parent[neighbor_key] = key
+                stats.generated += 1
+                if self.on_generate is not None:
+                    self.on_generate(neighbor, g + 1)
+                if neighbor_key in closed:
+                    self.inconsistent.add(neighbor_key)
+                else:
+                    self.__push(neighbor_key)
+            if len(heap) > stats.max_open:
+                stats.max_open = len(heap)
+        return True
+
+    def __bound(self) -> float:
+        """Suboptimality bound of the current solution"""
+        g_of, h_of = self.g, self.h
+        lowest = min(
+            (g + h for _, h, _, g, key in self.heap if g == g_of[key]),
+            default=inf,
+        )
+        for key in self.inconsistent:
+            lowest = min(lowest, g_of[key] + h_of[key])
+        moves = g_of[self.goal]
+        if lowest >= moves:
+            return 1.0
+        return min(self.weight, moves / lowest)
+
+    def __blanks(self) -> list[int]:
+        """Positions of the blank tile from the initial board to the goal"""
+        blanks = []
+        key = self.goal
+        while key is not None:
+            blanks.append(self.boards[key].linear_board.index(0))
+            key = self.parent[key]
+        return blanks[::-1]
+
+    def search(self, time_budget: Optional[float] = None) -> Iterator[tuple]:
+        """
+        Yield (positions of the blank tile, bound) each time the solution or its
+        bound improves. The first solution is always searched to the end, the
+        next ones only while time_budget seconds (None: no limit) have not passed
+        """
+        deadline = inf if time_budget is None else perf_counter() + time_budget
+        moves, bound = inf, inf
+        while True:
+            complete = self.__improve(deadline)
+            if self.goal is None:
+                return  # the open list ran out without reaching the goal
+            if complete:
+                new_bound = self.__bound()
+            else:
+                new_bound = bound  # the search was interrupted, nothing changes
+            if self.g[self.goal] < moves or new_bound < bound:
+                moves, bound = self.g[self.goal], new_bound
+                yield self.__blanks(), bound
+            if not complete or bound <= 1 or perf_counter() > deadline:
+                return
+            # next search: lower weight, the inconsistent boards are opened again
+            # and the open list is ordered by the new weight
+            self.weight = max(1.0, self.weight - self.step)
+            g_of = self.g
+            keys = {key for _, _, _, g, key in self.heap if g == g_of[key]}
+            keys |= self.inconsistent
+            self.inconsistent = set()
+            self.closed = set()
+            self.heap = []
+            for key in keys:
+                g, h = g_of[key], self.h[key]
+                self.heap.append((g + self.weight * h, h, self.order, g, key))
+                self.order += 1
+            heapify(self.heap)
@@ -0,0 +1,247 @@
+import argparse
+import os
+import resource
+import signal
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from board import PackedBoard
+from loader import load, read_blocks
+import solutionCache
+from solutionCache import SolutionCache
+from solver import HeuristicDistance, SearchAlgorithm, Solver
+
+# *****************************************************************************
+#  Execution:    python batch.py [options] path [path ...]
+#  Dependencies: board.py loader.py solver.py solutionCache.py
+#
+#  Solve many boards at once. Each path can be a file (with one or more boards,
+#  or a .jsonl file, see loader.py), a directory (all its puzzle*.txt files) or
+#  a glob pattern. The boards are read and validated one at a time, the invalid
+#  and unsolvable ones are reported right away and the rest are solved in a pool
+#  of worker processes, printing the results as soon as each one finishes.
+#
+#  Example:
+#  python batch.py --workers 4 --timeout 60 --heuristic LINEAR_CONFLICT \
+#                  "source_data/puzzle4x4-*.txt"
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+
+IN_FLIGHT = 2  # boards submitted per worker before waiting for a result
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of solving one puzzle file
+    path:    the puzzle file
+    moves:   minimum number of moves (-1 if the board has no solution)
+    seconds: wall time spent by the worker
+    error:   None, or the reason why the board was not solved
+             (timeout, memory limit, invalid file...)
+    solution: moves of the blank tile (U, D, L or R) that solve the board
+    """
+
+    path: str
+    moves: int
+    seconds: float
+    error: Optional[str] = None
+    solution: str = ""
+
+
+def _limit_memory(memory_limit: Optional[int]):
+    """Pool initializer, caps the address space of the worker (in bytes)"""
+    if memory_limit is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def _timeout(signum, frame):
+    raise TimeoutError()
+
+
+@contextmanager
+def time_limit(seconds: Optional[float]):
+    """Raise TimeoutError inside the block after the given seconds (None: no limit)"""
+    if seconds is None:
+        yield
+        return
+    signal.signal(signal.SIGALRM, _timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+_caches: dict[str, SolutionCache] = {}  # the caches opened by this worker
+
+
+def _cache_at(path: Optional[str]) -> Optional[SolutionCache]:
+    if path is None:
+        return None
+    if path not in _caches:
+        _caches[path] = SolutionCache(path)
+    return _caches[path]
+
+
+def solve_file(
+    path: str,
+    heuristic: HeuristicDistance,
+    algorithm: SearchAlgorithm,
+    timeout: Optional[float] = None,
+    cache: Optional[str] = None,
+) -> BatchResult:
+    """Solve the board of a puzzle file (see solve_blocks)"""
+    try:
+        blocks = read_blocks(path)
+    except (OSError, ValueError) as e:
+        return BatchResult(path, -1, 0.0, "invalid board: " + str(e))
+    return solve_blocks(path, blocks, heuristic, algorithm, timeout, cache)
+
+
+def solve_blocks(
+    path: str,
+    blocks: list[list[int]],
+    heuristic: HeuristicDistance,
+    algorithm: SearchAlgorithm,
+    timeout: Optional[float] = None,
+    cache: Optional[str] = None,
+) -> BatchResult:
+    """
+    Solve one board already validated, this function runs inside the worker
+    processes. cache is the path of a SolutionCache shared by all the workers.
+    Any error of the solver is returned in the result, so one board never
+    stops the batch
+    """
+    start = time.perf_counter()
+    try:
+        solutions = _cache_at(cache)
+        with time_limit(timeout):
+            solver = Solver(PackedBoard(blocks), heuristic, algorithm, cache=solutions)
+        if solutions is not None:
+            solutions.flush()  # the workers exit without closing the cache
+        return BatchResult(
+            path,
+            solver.number_of_moves(),
+            time.perf_counter() - start,
+            solution=solver.solution_moves(),
+        )
+    except TimeoutError:
+        error = "timeout"
+    except MemoryError:
+        error = "memory limit"
+    except Exception as e:  # e.g. a heuristic that doesn't support the size
+        error = f"{type(e).__name__}: {e}"
+    return BatchResult(path, -1, time.perf_counter() - start, error)
+
+
+def solve_files(
+    paths: Iterable[str],
+    heuristic: HeuristicDistance = HeuristicDistance.MANHATTAN,
+    algorithm: SearchAlgorithm = SearchAlgorithm.ASTAR,
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    memory_limit: Optional[int] = None,
+    cache: Optional[str] = None,
+) -> Iterator[BatchResult]:
+    """
+    Solve every board of the files in a pool of worker processes (one per core by
+    default) and yield the results in the order they finish, the invalid and
+    unsolvable boards as soon as they are read. timeout is in seconds per board,
+    memory_limit in bytes per worker and cache the path of a SolutionCache
+
+    The files are read while the boards are solved: at most IN_FLIGHT boards per
+    worker wait in the pool, so the first results come out before the last file
+    is read and a huge .jsonl file is never held in memory
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_limit_memory, initargs=(memory_limit,)
+    ) as pool:
+        pending: set = set()
+        for record in load(paths, strict=False):
+            if record.error is not None:
+                yield BatchResult(record.name, -1, 0.0, "invalid board: " + record.error)
+            elif not record.solvable:
+                yield BatchResult(record.name, -1, 0.0)
+            else:
+                pending.add(
+                    pool.submit(
+                        solve_blocks,
+                        record.name,
+                        record.blocks,
+                        heuristic,
+                        algorithm,
+                        timeout,
+                        cache,
+                    )
+                )
+            if len(pending) >= IN_FLIGHT * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            else:
+                done = {future for future in pending if future.done()}
+                pending -= done
+            for future in done:
+                yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many n-puzzle boards")
+    parser.add_argument("paths", nargs="+", help="files, directories or glob patterns")
+    parser.add_argument(
+        "--heuristic",
+        choices=[h.name for h in HeuristicDistance],
+        default=HeuristicDistance.MANHATTAN.name,
+    )
+    parser.add_argument(
+        "--algorithm",
+        choices=[a.name for a in SearchAlgorithm],
+        default=SearchAlgorithm.ASTAR.name,
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per board")
+    parser.add_argument("--memory", type=int, default=None, help="MB per worker")
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=str(solutionCache.default_path()),
+        default=None,
+        help="SQLite file of solved boards (source_data/solutions.sqlite if no path)",
+    )
+    parser.add_argument(
+        "--solution", action="store_true", help="print the moves of each solution"
+    )
+    args = parser.parse_args()
+
+    results = solve_files(
+        args.paths,
+        HeuristicDistance[args.heuristic],
+        SearchAlgorithm[args.algorithm],
+        args.workers,
+        args.timeout,
+        None if args.memory is None else args.memory * 1024 * 1024,
+        args.cache,
+    )
+    for result in results:
+        if result.error is not None:
+            status = result.error
+        elif result.moves < 0:
+            status = "no solution"
+        else:
+            status = str(result.moves) + " moves"
+            if args.solution:
+                status += " " + result.solution
+        print(f"{Path(result.path).name}: {status} ({result.seconds:.3f} s)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+import argparse
+import csv
+import glob
+import json
+import re
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from batch import time_limit
+from board import PackedBoard
+from loader import read_blocks
+from solver import HeuristicDistance, QueueBackend, SearchAlgorithm, Solver
+
+# *****************************************************************************
+#  Execution:    python benchmark.py [options]
+#  Dependencies: batch.py board.py loader.py solver.py
+#
+#  Benchmark of the solver over the puzzles of the source_data folder.
+#  Every solvable puzzle is solved with each combination of heuristic, search
+#  algorithm and priority queue, each run in a fresh process so the peak memory
+#  belongs only to that run. For every run we record:
+#
+#    wall time, nodes expanded and generated, peak RSS, maximum open list size
+#    and the length of the solution
+#
+#  The expected number of moves is part of the file name (puzzle3x3-27.txt and
+#  puzzle27.txt need 27 moves) and it is checked on every run.
+#
+#  The results can be saved as JSON or CSV. When a baseline (a JSON file written
+#  with --save-baseline) is given, the benchmark fails if a run got slower, used
+#  more memory or expanded more nodes than the baseline beyond the threshold.
+#
+#  Examples:
+#  python benchmark.py --sizes 3 --save-baseline baseline.json
+#  python benchmark.py --sizes 3 --baseline baseline.json --threshold 0.25
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+DATA_FOLDER = Path(__file__).parent / "source_data"
+
+# measures compared against the baseline (the time only above min_seconds)
+MEASURES = ("seconds", "expanded", "generated", "peak_rss_kb")
+
+
+def expected_moves(path: str) -> Optional[int]:
+    """Number of moves encoded in the name of the file (None for unsolvable)"""
+    match = re.fullmatch(r"puzzle(?:\dx\d-)?(\d+)\.txt", Path(path).name)
+    return None if match is None else int(match.group(1))
+
+
+def corpus(sizes, max_moves: int) -> dict[int, list[str]]:
+    """Solvable puzzle files of the source_data folder grouped by size"""
+    groups: dict[int, list[str]] = {}
+    for path in sorted(glob.glob(str(DATA_FOLDER / "puzzle*.txt"))):
+        moves = expected_moves(path)
+        if moves is None or moves > max_moves:
+            continue
+        n = len(read_blocks(path))
+        if n in sizes:
+            groups.setdefault(n, []).append(path)
+    return groups
+
+
+def configurations(n: int, heuristics, algorithms, queues):
+    """(heuristic, algorithm, queue) to run for a board size"""
+    for heuristic in heuristics:
+        if heuristic == HeuristicDistance.WALKING_DISTANCE and n > 4:
+            continue
+        for algorithm in algorithms:
+            if algorithm == SearchAlgorithm.ASTAR:
+                for queue in queues:
+                    yield heuristic, algorithm, queue
+            else:
+                yield heuristic, algorithm, None  # no priority queue involved
+
+
+def run_case(path: str, heuristic, algorithm, queue, timeout) -> dict:
+    """Solve one board, this function runs in its own process"""
+    record = {
+        "file": Path(path).name,
+        "size": 0,
+        "heuristic": heuristic.name,
+        "algorithm": algorithm.name,
+        "queue": "-" if queue is None else queue.name,
+        "expected": expected_moves(path),
+        "moves": None,
+        "status": "ok",
+    }
+    blocks = read_blocks(path)
+    record["size"] = len(blocks)
+    start = time.perf_counter()
+    try:
+        with time_limit(timeout):
+            solver = Solver(
+                PackedBoard(blocks),
+                heuristic,
+                algorithm,
+                QueueBackend.HEAPQ if queue is None else queue,
+                state_tables=False,  # measure the search, not the lookups
+            )
+    except TimeoutError:
+        record["status"] = "timeout"
+    except MemoryError:
+        record["status"] = "memory limit"
+    else:
+        record["moves"] = solver.number_of_moves()
+        record["expanded"] = solver.stats.expanded
+        record["generated"] = solver.stats.generated
+        record["duplicates"] = solver.stats.duplicates
+        record["max_open"] = solver.stats.max_open
+        if record["moves"] != record["expected"]:
+            record["status"] = "wrong number of moves"
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    record["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return record
+
+
+def run(groups, heuristics, algorithms, queues, timeout):
+    """Run every case (one at a time) and yield the records as they finish"""
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for n, paths in sorted(groups.items()):
+            for path in paths:
+                for heuristic, algorithm, queue in configurations(
+                    n, heuristics, algorithms, queues
+                ):
+                    yield pool.submit(
+                        run_case, path, heuristic, algorithm, queue, timeout
+                    ).result()
+
+
+def case_key(record: dict) -> tuple:
+    return (record["file"], record["heuristic"], record["algorithm"], record["queue"])
+
+
+def regressions(records, baseline, threshold: float, min_seconds: float) -> list[str]:
+    """Differences with the baseline beyond the threshold (a relative increase)"""
+    previous = {case_key(record): record for record in baseline}
+    problems = []
+    for record in records:
+        old = previous.get(case_key(record))
+        if old is None:
+            continue
+        name = " ".join(str(part) for part in case_key(record))
+        if old["status"] == "ok" and record["status"] != "ok":
+            problems.append(f"{name}: {record['status']}")
+            continue
+        if record["status"] != "ok":
+            continue
+        for measure in MEASURES:
+            if measure == "seconds" and old[measure] < min_seconds:
+                continue
+            if record[measure] > old[measure] * (1 + threshold):
+                problems.append(
+                    f"{name}: {measure} {old[measure]} -> {record[measure]}"
+                )
+    return problems
+
+
+def save(records, path: str):
+    if path.endswith(".csv"):
+        fields = list(dict.fromkeys(field for record in records for field in record))
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w") as f:
+            json.dump(records, f, indent=1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark of the n-puzzle solver")
+    parser.add_argument("--sizes", default="2,3,4", help="board sizes, e.g. 3,4")
+    parser.add_argument("--max-moves", type=int, default=31)
+    parser.add_argument(
+        "--heuristics",
+        default="MANHATTAN,LINEAR_CONFLICT,WALKING_DISTANCE",
+        help="comma separated HeuristicDistance names",
+    )
+    parser.add_argument("--algorithms", default="ASTAR,IDASTAR")
+    parser.add_argument(
+        "--queues", default=",".join(queue.name for queue in QueueBackend)
+    )
+    parser.add_argument("--timeout", type=float, default=60, help="seconds per run")
+    parser.add_argument("--output", help="save the results (.json or .csv)")
+    parser.add_argument("--save-baseline", help="save the results as a baseline")
+    parser.add_argument("--baseline", help="baseline to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="runs faster than this in the baseline are not compared by time",
+    )
+    args = parser.parse_args()
+
+    groups = corpus({int(n) for n in args.sizes.split(",")}, args.max_moves)
+    heuristics = [HeuristicDistance[name] for name in args.heuristics.split(",")]
+    algorithms = [SearchAlgorithm[name] for name in args.algorithms.split(",")]
+    queues = [QueueBackend[name] for name in args.queues.split(",")]
+
+    records = []
+    failures = []
+    for record in run(groups, heuristics, algorithms, queues, args.timeout):
+        records.append(record)
+        name = " ".join(str(part) for part in case_key(record))
+        if record["status"] == "ok":
+            print(
+                f"{name}: {record['moves']} moves {record['seconds']:.3f} s "
+                f"{record['expanded']} expanded {record['generated']} generated "
+                f"{record['max_open']} open {record['peak_rss_kb']} KB",
+                flush=True,
+            )
+        else:
+            print(f"{name}: {record['status']}", flush=True)
+            if record["status"] == "wrong number of moves":
+                failures.append(f"{name}: {record['moves']} moves")
+
+    # totals by size and configuration
+    totals: dict[tuple, list] = {}
+    for record in records:
+        if record["status"] == "ok":
+            key = (record["size"],) + case_key(record)[1:]
+            total = totals.setdefault(key, [0, 0.0, 0])
+            total[0] += 1
+            total[1] += record["seconds"]
+            total[2] += record["expanded"]
+    print()
+    for (n, heuristic, algorithm, queue), (count, seconds, expanded) in sorted(
+        totals.items()
+    ):
+        print(
+            f"{n}x{n} {heuristic} {algorithm} {queue}: {count} boards "
+            f"{seconds:.3f} s {expanded} expanded"
+        )
+
+    if args.output:
+        save(records, args.output)
+    if args.save_baseline:
+        save(records, args.save_baseline)
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += regressions(
+                records, json.load(f), args.threshold, args.min_seconds
+            )
+    for failure in failures:
+        print("FAIL " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,42 +1,166 @@
 import random
+from bisect import bisect_left
 from typing import Final
 
+import walkingDistance
+
+try:
+    import _boardKernel  # compiled hot path, built with python boardKernel.py
+except ImportError:
+    _boardKernel = None  # the pure Python code does the same work
+
 # *****************************************************************************
 #  Execution:    none
-#  Dependencies: nonez
+#  Dependencies: walkingDistance.py (_boardKernel optional, see boardKernel.py)
 #  Representation of a n-puzzle board object
 #  @author Eduardo Ch. Colorado
 # ******************************************************************************/
 
 
+def count_inversions(tiles) -> int:
+    """
+    Number of pairs of tiles (the blank excluded) that are in the wrong order.
+    A Fenwick tree counts how many greater tiles were already seen, so the cost
+    is O(n log n) for n tiles
+    """
+    size = max(tiles) + 1
+    tree = [0] * (size + 1)
+    inversions = 0
+    seen = 0
+    for tile in tiles:
+        if tile == 0:
+            continue
+        smaller = 0  # tiles smaller or equal than this tile already seen
+        i = tile
+        while i > 0:
+            smaller += tree[i]
+            i -= i & -i
+        inversions += seen - smaller
+        seen += 1
+        i = tile
+        while i <= size:
+            tree[i] += 1
+            i += i & -i
+    return inversions
+
+
+def parity(n: int, inversions: int, blank_row: int) -> int:
+    """
+    Invariant of the n-puzzle game: a move of the blank tile along a row does not
+    change the number of inversions and a move along a column changes it by n - 1
+    tiles. For odd sizes the parity of the inversions never changes, for even
+    sizes the parity of the inversions plus the row of the blank tile (counted
+    from the top) never changes. Two boards with the same parity reach each other
+    """
+    if n % 2 == 1:
+        return inversions % 2
+    return (inversions + blank_row) % 2
+
+
+def solvable(n: int, inversions: int, blank_row: int) -> bool:
+    """
+    Parity rule of the n-puzzle game for the goal with the blank tile at the end:
+    for odd sizes the number of inversions must be even, for even sizes the number
+    of inversions plus the row of the blank tile must be odd
+    """
+    return parity(n, inversions, blank_row) == parity(n, 0, n - 1)
+
+
+def standard_goal(n: int) -> list[list[int]]:
+    """Goal board with the tiles in order and the blank tile at the end"""
+    return [[(i * n + j + 1) % (n * n) for j in range(n)] for i in range(n)]
+
+
+def spiral_goal(n: int) -> list[list[int]]:
+    """Goal board with the tiles in clockwise spiral order and the blank last"""
+    blocks = [[0] * n for _ in range(n)]
+    i, j, di, dj = 0, 0, 0, 1
+    for tile in range(1, n * n):
+        blocks[i][j] = tile
+        if not (0 <= i + di < n and 0 <= j + dj < n and blocks[i + di][j + dj] == 0):
+            di, dj = dj, -di  # turn right at the border or at a placed tile
+        i, j = i + di, j + dj
+    return blocks
+
+
+# Moves of the blank tile, a solution is stored as one ASCII byte per move
+MOVES: Final = {"U": (-1, 0), "D": (1, 0), "L": (0, -1), "R": (0, 1)}
+
+
+def move_name(n: int, Idx: int, nIdx: int) -> str:
+    """Name of the move that takes the blank tile from Idx to the adjacent nIdx"""
+    step = (nIdx // n - Idx // n, nIdx % n - Idx % n)
+    for name, offset in MOVES.items():
+        if offset == step:
+            return name
+    raise ValueError(f"positions {Idx} and {nIdx} are not adjacent")
+
+
+def move_target(n: int, Idx: int, move: str) -> int:
+    """Position of the blank tile after applying the move to the blank at Idx"""
+    if move not in MOVES:
+        raise ValueError(f"unknown move {move!r}, expected one of U, D, L, R")
+    di, dj = MOVES[move]
+    i, j = Idx // n + di, Idx % n + dj
+    if not (0 <= i < n and 0 <= j < n):
+        raise ValueError(f"move {move} takes the blank tile out of the board")
+    return i * n + j
+
+
 class Board(object):
     """
     Defines a Board for the n-puzzle game
     """
 
     # Constructor
-    def __init__(self, blocks: list[list[int]]):
+    def __init__(self, blocks: list[list[int]], goal: list[list[int]] | None = None):
         """
         Creates an instance of a board
         Internally, the content of the board is represented as 1D array
         where each row in the 2D board is append to the right, from top
         to bottom
         Also the Manhattan and Hamming are calculated as private properties of the class
+        The linear conflicts and walking distance keys are calculated the first time
+        they are required, then the neighbors update them from the tile that moved
+        goal is the target board (by default the tiles in order and the blank last)
         """
-        self.n: Final[int] = len(blocks)
-        self.linear_board: list[int] = []
-        self.Manhattan: int = 0
-        self.Hamming: int = 0
-        for i in range(self.n):
-            for j in range(self.n):
-                entry = blocks[i][j]
-                self.linear_board.append(entry)
+        self.__fill(blocks, _tables_for(len(blocks), goal))
+
+    def __fill(self, blocks: list[list[int]], tables: "_PackedTables"):
+        distances, goal_tiles = tables.distances, tables.goal_board
+        if _boardKernel is not None:
+            self.__set(tables, *_boardKernel.fill(blocks, distances, goal_tiles))
+            return
+        # the same checks and errors as the kernel
+        n = len(blocks)
+        cells = n * n
+        linear_board: list[int] = []
+        manhattan = hamming = 0
+        for i in range(n):
+            row = blocks[i]
+            if len(row) != n:
+                raise ValueError("the board must be square")
+            for j in range(n):
+                entry = row[j]
+                if not 0 <= entry < cells:
+                    raise ValueError(f"tile {entry} out of range")
+                idx = len(linear_board)
+                linear_board.append(entry)
                 if entry != 0:
-                    self.Manhattan += abs(i - (entry - 1) // self.n) + abs(
-                        j - ((entry - 1) % self.n)
-                    )
-                    if entry != self.n * i + j + 1:
-                        self.Hamming += 1
+                    manhattan += distances[entry][idx]
+                    if entry != goal_tiles[idx]:
+                        hamming += 1
+        self.__set(tables, linear_board, manhattan, hamming)
+
+    def __set(self, tables, linear_board: list[int], manhattan: int, hamming: int):
+        self.n: Final[int] = tables.n
+        self.tables = tables
+        self.linear_board = linear_board
+        self.Manhattan = manhattan
+        self.Hamming = hamming
+        self.Conflicts: int | None = None
+        self.VerticalKey: int | None = None
+        self.HorizontalKey: int | None = None
 
     def dimension(self):
         """Size of the board game"""
@@ -50,15 +174,46 @@ class Board(object):
         """Hamming distance"""
         return self.Hamming
 
+    def linear_conflict(self):
+        """
+        Manhattan distance plus two moves for each tile that has to leave its goal
+        row (or column) to let other tiles of the same line pass
+        """
+        if self.Conflicts is None:
+            self.Conflicts = self.tables.conflicts(self.linear_board.__getitem__)
+        return self.Manhattan + 2 * self.Conflicts
+
+    def walking_distance(self):
+        """Walking distance (vertical plus horizontal moves of walkingDistance.py)"""
+        tables = self.tables
+        if self.VerticalKey is None:
+            self.VerticalKey, self.HorizontalKey = tables.walking_keys(
+                self.linear_board
+            )
+        vertical, horizontal = tables.walking_tables()
+        return vertical[self.VerticalKey] + horizontal[self.HorizontalKey]
+
     def inversions(self):
-        pass
+        """Number of pairs of tiles in the wrong order"""
+        return count_inversions(self.linear_board)
+
+    def is_solvable(self) -> bool:
+        """Determine if the goal board can be reached from this board"""
+        blank_row = self.linear_board.index(0) // self.n
+        return parity(self.n, self.inversions(), blank_row) == self.tables.goal_parity
 
     def is_goal(self) -> bool:
         """Determine when a given board is the goal board"""
-        for i in range(0, self.n * self.n - 1):
-            if self.linear_board[i] != i + 1:
-                return False  # if the linear array is not sorted in ascending order, then the board is not the goal board
-        return True
+        return self.linear_board == self.tables.goal_board
+
+    def goal_blocks(self) -> list[list[int]]:
+        """The goal board of this board as 2D list"""
+        return self.tables.goal_blocks()
+
+    def blocks(self) -> list[list[int]]:
+        """The content of the board as 2D list"""
+        n = self.n
+        return [self.linear_board[i * n : (i + 1) * n] for i in range(n)]
 
     def __get_board(self):
         return self.linear_board
@@ -76,19 +231,22 @@ class Board(object):
         neighbor[l][m] = 0
         return neighbor
 
+    def key(self) -> bytes:
+        """
+        Compact and hashable encoding of the board (one byte per tile), used
+        by the solver to recognize states that were already expanded
+        """
+        return bytes(self.linear_board)
+
     ##Overload the comparison method
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self.n == other.n and self.linear_board == other.linear_board
         else:
             return False
-        # if(self == other): return True
-        # if(other == None): return False
-        # if(not isinstance(other, Board)): return False
-        # other_board = other.__get_board()
-        # for i in range(self.n*self.n):
-        #     if(self.linear_board[i] != other_board[i]): return False
-        # return True
+
+    def __hash__(self):
+        return hash(self.key())
 
     # Iterate through the possibles bottom, up, left and right blank tiles moves (we called them neighbors)
     def neighbors(self):
@@ -101,17 +259,62 @@ class Board(object):
         # create a neighbor list
         L: list[Board] = []
         if idx // self.n != 0:
-            L.append(Board(self.__swap(idx, idx - self.n)))  # up neighbor
+            L.append(self.__neighbor(idx, idx - self.n))  # up neighbor
         if (idx + 1) // self.n == idx // self.n:
-            L.append(Board(self.__swap(idx, idx + 1)))  # right neighbor
+            L.append(self.__neighbor(idx, idx + 1))  # right neighbor
         if idx + self.n < self.n**2:
-            L.append(Board(self.__swap(idx, idx + self.n)))  # botton neighopur
+            L.append(self.__neighbor(idx, idx + self.n))  # botton neighopur
         if (idx - 1) // self.n == idx // self.n and idx - 1 >= 0:
-            L.append(Board(self.__swap(idx, idx - 1)))  # left neighbor
+            L.append(self.__neighbor(idx, idx - 1))  # left neighbor
 
         while len(L) != 0:
             yield L.pop()
 
+    def moved(self, move: str) -> "Board":
+        """Board after moving the blank tile in the direction U, D, L or R"""
+        idx = self.linear_board.index(0)
+        return self.__neighbor(idx, move_target(self.n, idx, move))
+
+    def __neighbor(self, Idx: int, nIdx: int):
+        """
+        Board after the swap, the heuristics already calculated for this board are
+        updated from the tile that moved instead of being calculated again
+        """
+        neighbor = Board.__new__(Board)
+        if _boardKernel is not None:
+            tables = self.tables
+            neighbor.__set(
+                tables,
+                *_boardKernel.neighbor(
+                    self.linear_board,
+                    Idx,
+                    nIdx,
+                    tables.distances,
+                    tables.goal_board,
+                    self.Manhattan,
+                    self.Hamming,
+                ),
+            )
+        else:
+            neighbor.__fill(self.__swap(Idx, nIdx), self.tables)
+        if self.Conflicts is not None or self.VerticalKey is not None:
+            tables = self.tables
+            if self.Conflicts is not None:
+                before = self.linear_board.__getitem__
+                after = neighbor.linear_board.__getitem__
+                neighbor.Conflicts = (
+                    self.Conflicts
+                    - tables.moved_conflicts(before, Idx, nIdx)
+                    + tables.moved_conflicts(after, Idx, nIdx)
+                )
+            if self.VerticalKey is not None:
+                vertical, horizontal = tables.walking_delta(
+                    self.linear_board[nIdx], nIdx, Idx
+                )
+                neighbor.VerticalKey = self.VerticalKey + vertical
+                neighbor.HorizontalKey = self.HorizontalKey + horizontal
+        return neighbor
+
     def __str__(self) -> str:
         s = "\n".join(
             "  ".join([str(self.linear_board[i * self.n + j]) for j in range(self.n)])
@@ -120,6 +323,352 @@ class Board(object):
         return s + "\n"
 
 
+class _PackedTables(object):
+    """
+    Lookup tables shared by every board of the same size and goal, they are built
+    once per goal so the hot loop only performs table lookups
+    bits:       number of bits used to store a tile
+    goal_board: the goal as 1D array (the goal tile of each position)
+    goal:       the goal packed as PackedBoard does
+    goal_row:   goal row of each tile
+    goal_col:   goal column of each tile
+    distances:  Manhattan distance of each tile placed at each position
+    goal_parity: parity of the goal, only boards with the same parity reach it
+    moves:     for each blank position, the positions the blank can move to
+               (in the same order used by Board.neighbors)
+    rows:      positions of each row
+    cols:      positions of each column
+    """
+
+    def __init__(self, n: int, goal_board: tuple[int, ...]):
+        if sorted(goal_board) != list(range(n * n)):
+            raise ValueError(f"the goal must have the tiles 0 to {n * n - 1} once")
+        self.n = n
+        self.bits = max(4, (n * n - 1).bit_length())
+        self.mask = (1 << self.bits) - 1
+        self.goal_board = list(goal_board)
+        self.goal_row = [0] * (n * n)
+        self.goal_col = [0] * (n * n)
+        self.goal = 0
+        for idx, tile in enumerate(goal_board):
+            self.goal_row[tile] = idx // n
+            self.goal_col[tile] = idx % n
+            self.goal |= tile << (idx * self.bits)
+        self.distances = [
+            [
+                abs(idx // n - self.goal_row[tile]) + abs(idx % n - self.goal_col[tile])
+                for idx in range(n * n)
+            ]
+            for tile in range(n * n)
+        ]
+        self.distances[0] = [0] * (n * n)  # the blank tile is not counted
+        self.goal_parity = parity(
+            n, count_inversions(goal_board), goal_board.index(0) // n
+        )
+        self.moves = []
+        for idx in range(n * n):
+            i, j = idx // n, idx % n
+            targets = []
+            if j > 0:
+                targets.append(idx - 1)  # left neighbor
+            if i < n - 1:
+                targets.append(idx + n)  # bottom neighbor
+            if j < n - 1:
+                targets.append(idx + 1)  # right neighbor
+            if i > 0:
+                targets.append(idx - n)  # up neighbor
+            self.moves.append(tuple(targets))
+        self.rows = [tuple(range(i * n, (i + 1) * n)) for i in range(n)]
+        self.cols = [tuple(range(j, n * n, n)) for j in range(n)]
+        self.__walking_tables = None
+
+    def distance(self, tile: int, idx: int) -> int:
+        """Manhattan distance of a tile placed at the position idx"""
+        return self.distances[tile][idx]
+
+    def goal_blocks(self) -> list[list[int]]:
+        n = self.n
+        return [self.goal_board[i * n : (i + 1) * n] for i in range(n)]
+
+    def __line_conflicts(
+        self, tile_at, cells, line: int, goal_line, goal_order
+    ) -> int:
+        """
+        Number of tiles of a line that must leave it to let the rest of the tiles
+        that belong to the line reach their goal positions, that is the number of
+        tiles of the line minus its longest sequence already in goal order
+        """
+        tails: list[int] = []
+        count = 0
+        for idx in cells:
+            tile = tile_at(idx)
+            if tile != 0 and goal_line[tile] == line:
+                count += 1
+                order = goal_order[tile]
+                k = bisect_left(tails, order)
+                if k == len(tails):
+                    tails.append(order)
+                else:
+                    tails[k] = order
+        return count - len(tails)
+
+    def row_conflicts(self, tile_at, i: int) -> int:
+        cells = self.rows[i]
+        return self.__line_conflicts(tile_at, cells, i, self.goal_row, self.goal_col)
+
+    def col_conflicts(self, tile_at, j: int) -> int:
+        cells = self.cols[j]
+        return self.__line_conflicts(tile_at, cells, j, self.goal_col, self.goal_row)
+
+    def conflicts(self, tile_at) -> int:
+        """Linear conflicts of every row and column, tile_at(idx) gives the tiles"""
+        return sum(self.row_conflicts(tile_at, i) for i in range(self.n)) + sum(
+            self.col_conflicts(tile_at, j) for j in range(self.n)
+        )
+
+    def moved_conflicts(self, tile_at, Idx: int, nIdx: int) -> int:
+        """
+        Linear conflicts of the only lines changed by a move between the positions
+        Idx and nIdx: the two rows for a vertical move, the two columns otherwise
+        """
+        n = self.n
+        if Idx % n == nIdx % n:
+            return self.row_conflicts(tile_at, Idx // n) + self.row_conflicts(
+                tile_at, nIdx // n
+            )
+        return self.col_conflicts(tile_at, Idx % n) + self.col_conflicts(
+            tile_at, nIdx % n
+        )
+
+    def walking_keys(self, linear_board) -> tuple[int, int]:
+        """Vertical and horizontal walking distance keys of a board"""
+        return (
+            walkingDistance.key(self.n, linear_board, self.goal_row, True),
+            walkingDistance.key(self.n, linear_board, self.goal_col, False),
+        )
+
+    def walking_delta(self, tile: int, Idx: int, nIdx: int) -> tuple[int, int]:
+        """Change of the walking distance keys when a tile moves from Idx to nIdx"""
+        n = self.n
+        if Idx % n == nIdx % n:
+            goal = self.goal_row[tile]
+            moved = walkingDistance.cell(n, nIdx // n, goal)
+            return moved - walkingDistance.cell(n, Idx // n, goal), 0
+        goal = self.goal_col[tile]
+        moved = walkingDistance.cell(n, nIdx % n, goal)
+        return 0, moved - walkingDistance.cell(n, Idx % n, goal)
+
+    def walking_tables(self):
+        """Vertical and horizontal walking distance tables for the goal board"""
+        if self.__walking_tables is None:
+            vertical, horizontal = self.walking_keys(self.goal_board)
+            self.__walking_tables = (
+                walkingDistance.table(self.n, vertical),
+                walkingDistance.table(self.n, horizontal),
+            )
+        return self.__walking_tables
+
+
+_packed_tables: dict[tuple[int, ...], _PackedTables] = {}
+
+
+def _tables_for(n: int, goal: list[list[int]] | None = None) -> _PackedTables:
+    """Tables of the boards of size n that are solved when they reach the goal"""
+    if goal is None:
+        goal_board = tuple(range(1, n * n)) + (0,)
+    else:
+        if len(goal) != n or any(len(row) != n for row in goal):
+            raise ValueError(f"the goal must be a {n}x{n} board")
+        goal_board = tuple(tile for row in goal for tile in row)
+    tables = _packed_tables.get(goal_board)
+    if tables is None:
+        tables = _packed_tables[goal_board] = _PackedTables(n, goal_board)
+    return tables
+
+
+class PackedBoard(object):
+    """
+    Compact variant of Board for the n-puzzle game. It has the same API as Board
+    but the tiles are packed into a single integer (4 bits per tile up to 4x4
+    boards and 5 bits for bigger ones). The position of the blank tile is cached
+    and the Manhattan and Hamming distances of a neighbor are updated from the
+    only tile that moved, so generating a neighbor costs O(1)
+    """
+
+    __slots__ = (
+        "n",
+        "tables",
+        "tiles",
+        "blank",
+        "Manhattan",
+        "Hamming",
+        "Conflicts",
+        "VerticalKey",
+        "HorizontalKey",
+    )
+
+    def __init__(self, blocks: list[list[int]], goal: list[list[int]] | None = None):
+        """
+        Creates an instance of a board packing the 2D list of blocks row by row,
+        goal is the target board (by default the tiles in order and the blank last)
+        """
+        self.n: Final[int] = len(blocks)
+        self.tables = _tables_for(self.n, goal)
+        self.tiles = 0
+        self.blank = 0
+        self.Manhattan = 0
+        self.Hamming = 0
+        self.Conflicts = None
+        self.VerticalKey = None
+        self.HorizontalKey = None
+        bits = self.tables.bits
+        for i in range(self.n):
+            for j in range(self.n):
+                idx = i * self.n + j
+                entry = blocks[i][j]
+                self.tiles |= entry << (idx * bits)
+                if entry == 0:
+                    self.blank = idx
+                else:
+                    self.Manhattan += self.tables.distances[entry][idx]
+                    if entry != self.tables.goal_board[idx]:
+                        self.Hamming += 1
+
+    def dimension(self):
+        """Size of the board game"""
+        return self.n
+
+    def manhattan(self):
+        """Manhattan distance"""
+        return self.Manhattan
+
+    def hamming(self):
+        """Hamming distance"""
+        return self.Hamming
+
+    def linear_conflict(self):
+        """Manhattan distance plus two moves for each linear conflict"""
+        if self.Conflicts is None:
+            self.Conflicts = self.tables.conflicts(self.tile_at)
+        return self.Manhattan + 2 * self.Conflicts
+
+    def walking_distance(self):
+        """Walking distance (vertical plus horizontal moves of walkingDistance.py)"""
+        if self.VerticalKey is None:
+            self.VerticalKey, self.HorizontalKey = self.tables.walking_keys(
+                self.linear_board
+            )
+        vertical, horizontal = self.tables.walking_tables()
+        return vertical[self.VerticalKey] + horizontal[self.HorizontalKey]
+
+    def inversions(self):
+        """Number of pairs of tiles in the wrong order"""
+        return count_inversions(self.linear_board)
+
+    def is_solvable(self) -> bool:
+        """Determine if the goal board can be reached from this board"""
+        blank_row = self.blank // self.n
+        return parity(self.n, self.inversions(), blank_row) == self.tables.goal_parity
+
+    def is_goal(self) -> bool:
+        """Determine when a given board is the goal board"""
+        return self.tiles == self.tables.goal
+
+    def goal_blocks(self) -> list[list[int]]:
+        """The goal board of this board as 2D list"""
+        return self.tables.goal_blocks()
+
+    def blocks(self) -> list[list[int]]:
+        """The content of the board as 2D list"""
+        board, n = self.linear_board, self.n
+        return [board[i * n : (i + 1) * n] for i in range(n)]
+
+    @property
+    def linear_board(self) -> list[int]:
+        """The content of the board as 1D array (decoded on demand)"""
+        bits, mask = self.tables.bits, self.tables.mask
+        return [(self.tiles >> (idx * bits)) & mask for idx in range(self.n * self.n)]
+
+    def tile_at(self, idx: int) -> int:
+        """Tile placed at the position idx of the linear board"""
+        return (self.tiles >> (idx * self.tables.bits)) & self.tables.mask
+
+    def key(self) -> int:
+        """The packed tiles are already a compact and hashable encoding"""
+        return self.tiles
+
+    def slide(self, idx: int):
+        """
+        Move in place the blank tile to the position idx, sliding back to the
+        previous blank position undoes the move. Only boards that are not stored
+        in sets or dictionaries (e.g. the cursor of a depth first search) should
+        be modified this way
+        """
+        tables = self.tables
+        bits = tables.bits
+        blank = self.blank
+        tile = (self.tiles >> (idx * bits)) & tables.mask
+        if self.Conflicts is not None:
+            self.Conflicts -= tables.moved_conflicts(self.tile_at, idx, blank)
+        self.tiles = (self.tiles & ~(tables.mask << (idx * bits))) | (
+            tile << (blank * bits)
+        )
+        distances, goal_tiles = tables.distances[tile], tables.goal_board
+        self.Manhattan += distances[blank] - distances[idx]
+        self.Hamming += (tile != goal_tiles[blank]) - (tile != goal_tiles[idx])
+        self.blank = idx
+        if self.Conflicts is not None:
+            self.Conflicts += tables.moved_conflicts(self.tile_at, idx, blank)
+        if self.VerticalKey is not None:
+            vertical, horizontal = tables.walking_delta(tile, idx, blank)
+            self.VerticalKey += vertical
+            self.HorizontalKey += horizontal
+
+    def moved(self, move: str) -> "PackedBoard":
+        """Board after moving the blank tile in the direction U, D, L or R"""
+        return self.__moved(move_target(self.n, self.blank, move))
+
+    def __moved(self, idx: int) -> "PackedBoard":
+        """Copy of the board after moving the blank tile to the position idx"""
+        neighbor = PackedBoard.__new__(PackedBoard)
+        neighbor.n = self.n
+        neighbor.tables = self.tables
+        neighbor.tiles = self.tiles
+        neighbor.blank = self.blank
+        neighbor.Manhattan = self.Manhattan
+        neighbor.Hamming = self.Hamming
+        neighbor.Conflicts = self.Conflicts
+        neighbor.VerticalKey = self.VerticalKey
+        neighbor.HorizontalKey = self.HorizontalKey
+        neighbor.slide(idx)
+        return neighbor
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.n == other.n and self.tiles == other.tiles
+        else:
+            return False
+
+    def __hash__(self):
+        return hash(self.tiles)
+
+    def neighbors(self):
+        """
+        Return the possible boards after moving the blank tile to valid positions
+        with respect to the reference Board
+        """
+        for idx in self.tables.moves[self.blank]:
+            yield self.__moved(idx)
+
+    def __str__(self) -> str:
+        board = self.linear_board
+        s = "\n".join(
+            "  ".join([str(board[i * self.n + j]) for j in range(self.n)])
+            for i in range(self.n)
+        )
+        return s + "\n"
+
+
 # n = 3
 # a = list(random.sample(range(n*n),n*n))
 
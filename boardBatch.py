@@ -0,0 +1,262 @@
+import sys
+import time
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only this module needs it
+    np = None
+
+from board import PackedBoard
+
+# *****************************************************************************
+#  Execution:    python boardBatch.py [path] [depth]
+#  Dependencies: numpy, board.py
+#
+#  Vectorized expansion of many boards at once. A batch keeps k boards as a
+#  k x n*n array of uint8 tiles (one row per board) and every operation works
+#  on the whole array with NumPy:
+#
+#  - expand() moves the blank tile of every board in each of the 4 directions
+#    at once (a fancy indexed swap per direction) and drops the moves that fall
+#    out of the board or undo the last move.
+#  - manhattan(), hamming() and linear_conflict() are lookups in tables built
+#    once per goal: distances[tile, position] for the Manhattan distance, and
+#    for the linear conflicts each line is encoded as a number in base n + 1
+#    (the goal order of the tiles of the line that belong to it, 0 for the rest)
+#    that indexes a table with the conflicts of every possible line.
+#
+#  This is meant for breadth first layers and the frontier of IDA*-like
+#  searches, where thousands of boards are processed the same way.
+#
+#  Example:
+#  python boardBatch.py source_data/puzzle4x4-30.txt 12
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("boardBatch needs numpy (pip install numpy)")
+
+
+def _line_conflicts(n: int, code: int) -> int:
+    """Tiles that must leave a line, the line given as a number in base n + 1"""
+    tails: list[int] = []
+    count = 0
+    for _ in range(n):
+        code, order = divmod(code, n + 1)
+        if order != 0:
+            count += 1
+            k = bisect_left(tails, order)
+            if k == len(tails):
+                tails.append(order)
+            else:
+                tails[k] = order
+    return count - len(tails)
+
+
+class _ArrayTables(object):
+    """
+    The tables of a goal (see board._PackedTables) as NumPy arrays
+    distances:  Manhattan distance of each tile (row) at each position (column)
+    moves:      for each blank position, the positions the blank can move to in
+                the order left, down, right, up (-1 when the move is not possible)
+    row_orders: for each row, goal column + 1 of the tiles that belong to it
+    col_orders: for each column, goal row + 1 of the tiles that belong to it
+    conflicts:  tiles to leave the line for every line code
+    """
+
+    def __init__(self, tables):
+        n = tables.n
+        cells = n * n
+        self.n = n
+        self.tables = tables
+        self.distances = np.array(tables.distances, dtype=np.uint8)
+        self.goal_board = np.array(tables.goal_board, dtype=np.uint8)
+        self.moves = np.full((cells, 4), -1, dtype=np.intp)
+        for idx, targets in enumerate(tables.moves):
+            for target in targets:
+                if target == idx - 1:
+                    self.moves[idx, 0] = target  # left
+                elif target == idx + n:
+                    self.moves[idx, 1] = target  # down
+                elif target == idx + 1:
+                    self.moves[idx, 2] = target  # right
+                else:
+                    self.moves[idx, 3] = target  # up
+        self.row_orders = np.zeros((n, cells), dtype=np.intp)
+        self.col_orders = np.zeros((n, cells), dtype=np.intp)
+        for tile in range(1, cells):
+            self.row_orders[tables.goal_row[tile], tile] = tables.goal_col[tile] + 1
+            self.col_orders[tables.goal_col[tile], tile] = tables.goal_row[tile] + 1
+        self.powers = (n + 1) ** np.arange(n, dtype=np.intp)
+        self.conflicts = np.array(
+            [_line_conflicts(n, code) for code in range((n + 1) ** n)], dtype=np.uint8
+        )
+        self.rows = [np.arange(i * n, (i + 1) * n) for i in range(n)]
+        self.cols = [np.arange(j, cells, n) for j in range(n)]
+
+
+_array_tables: dict[int, _ArrayTables] = {}
+
+
+def _arrays_for(tables) -> _ArrayTables:
+    arrays = _array_tables.get(id(tables))
+    if arrays is None or arrays.tables is not tables:
+        arrays = _array_tables[id(tables)] = _ArrayTables(tables)
+    return arrays
+
+
+class BoardBatch(object):
+    """
+    Many boards of the same size and goal
+    tiles:    k x n*n array of uint8, one board per row
+    blank:    position of the blank tile of each board
+    previous: position of the blank tile before the last move (-1 for none),
+              expand() does not undo the last move
+    parent:   row of the board of the previous batch that was expanded into
+              each board (-1 for the boards of the first batch)
+    """
+
+    def __init__(self, tiles, blank, arrays: _ArrayTables, previous=None, parent=None):
+        _require_numpy()
+        self.tiles = tiles
+        self.blank = blank
+        self.arrays = arrays
+        k = len(tiles)
+        self.previous = np.full(k, -1, np.intp) if previous is None else previous
+        self.parent = np.full(k, -1, np.intp) if parent is None else parent
+
+    @classmethod
+    def from_boards(cls, boards) -> "BoardBatch":
+        """Batch of Board or PackedBoard instances (all with the same goal)"""
+        _require_numpy()
+        boards = list(boards)
+        if len(boards) == 0:
+            raise ValueError("a batch needs at least one board")
+        tables = boards[0].tables
+        if any(board.tables is not tables for board in boards):
+            raise ValueError("the boards of a batch must have the same size and goal")
+        tiles = np.array([board.linear_board for board in boards], dtype=np.uint8)
+        blank = np.argmin(tiles, axis=1).astype(np.intp)
+        return cls(tiles, blank, _arrays_for(tables))
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def boards(self) -> list[PackedBoard]:
+        """The boards of the batch as PackedBoard instances"""
+        n = self.arrays.n
+        goal = self.arrays.tables.goal_blocks()
+        return [
+            PackedBoard([row[i * n : (i + 1) * n] for i in range(n)], goal)
+            for row in self.tiles.tolist()
+        ]
+
+    def select(self, mask) -> "BoardBatch":
+        """The boards selected by a boolean mask (or an array of rows)"""
+        return BoardBatch(
+            self.tiles[mask],
+            self.blank[mask],
+            self.arrays,
+            self.previous[mask],
+            self.parent[mask],
+        )
+
+    def unique(self) -> "BoardBatch":
+        """The batch without repeated boards (the first one of each is kept)"""
+        _, rows = np.unique(self.tiles, axis=0, return_index=True)
+        return self.select(np.sort(rows))
+
+    def is_goal(self):
+        """Boolean array, True for the boards that are the goal"""
+        return (self.tiles == self.arrays.goal_board).all(axis=1)
+
+    def manhattan(self):
+        """Manhattan distance of every board"""
+        cells = np.arange(self.tiles.shape[1])
+        return self.arrays.distances[self.tiles, cells].sum(axis=1, dtype=np.intp)
+
+    def hamming(self):
+        """Hamming distance of every board"""
+        wrong = (self.tiles != self.arrays.goal_board) & (self.tiles != 0)
+        return wrong.sum(axis=1, dtype=np.intp)
+
+    def linear_conflict(self):
+        """Manhattan distance plus two moves for each linear conflict of every board"""
+        arrays = self.arrays
+        conflicts = np.zeros(len(self), dtype=np.intp)
+        for i in range(arrays.n):
+            orders = arrays.row_orders[i][self.tiles[:, arrays.rows[i]]]
+            conflicts += arrays.conflicts[orders @ arrays.powers]
+            orders = arrays.col_orders[i][self.tiles[:, arrays.cols[i]]]
+            conflicts += arrays.conflicts[orders @ arrays.powers]
+        return self.manhattan() + 2 * conflicts
+
+    def expand(self) -> "BoardBatch":
+        """
+        Every board reached moving the blank tile of each board of the batch one
+        position (the moves that undo the last move are left out)
+        """
+        arrays = self.arrays
+        children = []
+        for direction in range(4):
+            targets = arrays.moves[self.blank, direction]
+            rows = np.nonzero((targets >= 0) & (targets != self.previous))[0]
+            if len(rows) == 0:
+                continue
+            targets = targets[rows]
+            blank = self.blank[rows]
+            tiles = self.tiles[rows]
+            k = np.arange(len(rows))
+            tiles[k, blank] = tiles[k, targets]
+            tiles[k, targets] = 0
+            children.append((tiles, targets, blank, rows))
+        if len(children) == 0:
+            empty = np.zeros(0, dtype=np.intp)
+            return BoardBatch(self.tiles[:0], empty, arrays, empty, empty)
+        return BoardBatch(
+            np.concatenate([child[0] for child in children]),
+            np.concatenate([child[1] for child in children]),
+            arrays,
+            np.concatenate([child[2] for child in children]),
+            np.concatenate([child[3] for child in children]),
+        )
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "source_data/puzzle4x4-30.txt"
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    from loader import read_blocks
+
+    board = PackedBoard(read_blocks(path))
+    # breadth first layers (without undoing the last move), object by object
+    start = time.perf_counter()
+    layer, generated = [(board, None)], 0
+    for _ in range(depth):
+        layer = [
+            (child, parent.tiles)
+            for parent, previous in layer
+            for child in parent.neighbors()
+            if child.tiles != previous
+        ]
+        generated += len(layer)
+        for child, _ in layer:
+            child.linear_conflict()
+    objects = time.perf_counter() - start
+    # the same layers as arrays
+    start = time.perf_counter()
+    batch = BoardBatch.from_boards([board])
+    for _ in range(depth):
+        batch = batch.expand()
+        batch.linear_conflict()
+    vectorized = time.perf_counter() - start
+    print(f"{generated} boards in {depth} layers (linear conflict of each one)")
+    print(f"objects:    {objects:.3f} s ({generated / objects:,.0f} boards/s)")
+    print(f"vectorized: {vectorized:.3f} s ({generated / vectorized:,.0f} boards/s)")
+
+
+if __name__ == "__main__":
+    main()
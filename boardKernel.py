@@ -0,0 +1,123 @@
+import argparse
+import glob
+import importlib
+import re
+import subprocess
+import sys
+import sysconfig
+import time
+from pathlib import Path
+
+# *****************************************************************************
+#  Execution:    python boardKernel.py [--check] [--cc COMPILER]
+#  Dependencies: a C compiler and the Python headers (board.py and solver.py
+#                for --check)
+#
+#  Build of _boardKernel, the compiled hot path of board.Board (see
+#  _boardKernel.c). It flattens the rows of a new board and moves the blank
+#  tile of a neighbor, with the Manhattan and Hamming distances, in C. board.py
+#  imports it when it was built and falls back to its pure Python code when it
+#  wasn't, the boards and the solutions are the same either way.
+#
+#  There is no packaging step, the extension is compiled next to board.py
+#  with the compiler and the flags of the running Python.
+#
+#  --check solves the solvable boards of source_data up to 40 moves with and
+#  without the kernel and fails when a solution or a counter differs.
+#  source_data/test_boardKernel.py (pytest) compares every solvable board of
+#  source_data, the errors of bad boards and the neighbors.
+#
+#  Examples:
+#  python boardKernel.py
+#  python boardKernel.py --check
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+FOLDER = Path(__file__).parent
+SOURCE = FOLDER / "_boardKernel.c"
+
+
+def target() -> Path:
+    return FOLDER / ("_boardKernel" + sysconfig.get_config_var("EXT_SUFFIX"))
+
+
+def build(compiler=None) -> Path:
+    """Compile the extension next to board.py, return its path"""
+    compiler = compiler or sysconfig.get_config_var("CC") or "cc"
+    command = compiler.split() + [
+        "-O2",
+        "-shared",
+        "-fPIC",
+        "-I" + sysconfig.get_paths()["include"],
+        str(SOURCE),
+        "-o",
+        str(target()),
+    ]
+    subprocess.run(command, check=True)
+    return target()
+
+
+def check(max_moves: int = 40) -> bool:
+    """Solve the boards of source_data (up to max_moves) with and without the kernel"""
+    import board
+    from loader import read_blocks
+    from solver import HeuristicDistance, Solver
+
+    kernel = board._boardKernel
+    if kernel is None:
+        raise ImportError("_boardKernel is not built (python boardKernel.py)")
+    same = True
+    timings = [0.0, 0.0]
+    for path in sorted(glob.glob(str(FOLDER / "source_data" / "puzzle*.txt"))):
+        # the number of moves is part of the name, the unsolvable boards are left out
+        moves = re.fullmatch(r"puzzle(?:\dx\d-)?(\d+)\.txt", Path(path).name)
+        if moves is None or int(moves.group(1)) > max_moves:
+            continue
+        blocks = read_blocks(path)
+        results = []
+        for index, module in enumerate((kernel, None)):
+            board._boardKernel = module
+            try:
+                start = time.perf_counter()
+                solver = Solver(
+                    board.Board(blocks),
+                    HeuristicDistance.LINEAR_CONFLICT,
+                    state_tables=False,
+                )
+                timings[index] += time.perf_counter() - start
+            finally:
+                board._boardKernel = kernel
+            stats = solver.stats
+            results.append(
+                (
+                    solver.number_of_moves(),
+                    solver.solution_moves(),
+                    stats.expanded,
+                    stats.generated,
+                    [str(b) for b in solver],
+                )
+            )
+        if results[0] != results[1]:
+            same = False
+            print(f"{Path(path).name}: the kernel and Python differ")
+    print(f"kernel {timings[0]:.2f} s, pure Python {timings[1]:.2f} s")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the board kernel")
+    parser.add_argument("--cc", default=None, help="C compiler command")
+    parser.add_argument(
+        "--check", action="store_true", help="compare with the pure Python code"
+    )
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(0 if check() else 1)
+    path = build(args.cc)
+    importlib.import_module("_boardKernel")
+    print("built " + str(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#******************************************************************************/
+#  Bucket priority queue
+#
+#  @author Eduardo Ch. Colorado
+#******************************************************************************/
+
+#   BUCKET PRIORITY QUEUE
+# When the priorities are small non negative integers (like the f = g + h cost of
+# the A* algorithm) we don't need a heap at all. An array of buckets is indexed
+# by the priority and each bucket is itself an array indexed by a second integer
+# key used to break the ties (the heuristic distance h, lower h first). Every
+# (priority, tie) pair has a stack of items.
+#
+#    priority    buckets (indexed by tie)
+#       0        []
+#       1        []
+#       2        [ [], [], [x] ]
+#       3        [ [y, z], [w] ]          <- lowest non empty priority
+#       ...
+#
+# Insert appends the item to its stack, O(1). The lowest non empty priority is
+# kept in self.low, so delMin only scans the few tie keys of that bucket and pops
+# the newest item of the first non empty stack. The priority only moves forward
+# while the items are removed (A* never inserts a priority lower than the last one
+# removed when its heuristic is consistent), otherwise self.low simply goes back.
+
+
+class BucketPQ(object):
+    def __init__(self):
+        self.buckets: list[list[list]] = []
+        self.low = 0
+        self.N = 0
+
+    def insert(self, x, priority: int, tie: int = 0):
+        buckets = self.buckets
+        while len(buckets) <= priority:
+            buckets.append([])
+        bucket = buckets[priority]
+        while len(bucket) <= tie:
+            bucket.append([])
+        bucket[tie].append(x)
+        if priority < self.low or self.N == 0:
+            self.low = priority
+        self.N += 1
+
+    def __lowest(self) -> list:
+        """Stack of items with the lowest priority and tie keys"""
+        # raise a underflow exception if the priority queue is empty
+        if self.N == 0:
+            raise Exception("Priority queue underflow")
+        while True:
+            for stack in self.buckets[self.low]:
+                if stack:
+                    return stack
+            self.low += 1
+
+    def delMin(self):
+        stack = self.__lowest()
+        self.N -= 1
+        return stack.pop()
+
+    def min(self):
+        return self.__lowest()[-1]
+
+    def size(self):
+        return self.N
+
+    def isEmpty(self):
+        return self.N == 0
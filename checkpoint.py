@@ -0,0 +1,197 @@
+import os
+import struct
+from math import inf
+from typing import NamedTuple
+
+# *****************************************************************************
+#  Execution:    none
+#  Dependencies: none
+#
+#  Checkpoint files of long searches, so a search can go on after a crash or a
+#  restart instead of starting again (see the checkpoint argument of Solver and
+#  Solver.from_checkpoint).
+#
+#  A* saves every board it knows: the expanded ones (closed) and the open list.
+#  Each board is a record of its tiles packed like PackedBoard does (4 bits per
+#  tile up to 4x4, 8 bytes for a 4x4 board), its number of moves g (2 bytes)
+#  and one byte with the move of the blank tile that reached it from its parent
+#  plus a closed flag. The parent of a board is the board with that move undone,
+#  so the chains of the solution are rebuilt from the moves alone.
+#
+#  IDA* keeps nothing but the current path, so it saves the threshold of the
+#  current iteration, the positions of the blank tile along the path (its depth
+#  first stack) and, for each level of the stack, the smallest f over the
+#  threshold found in the branches already searched.
+#
+#  Header (little endian): magic (NCKA for A*, NCKI for IDA*), version, n,
+#  PackedBoard flag, padding, the goal and the initial board (n * n bytes each),
+#  then the counters expanded, generated, duplicates and max_open (8 bytes each).
+#
+#  The file is written next to its final path and then renamed over it, so a
+#  crash while saving leaves the previous checkpoint intact.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+_ASTAR = b"NCKA"
+_IDASTAR = b"NCKI"
+_VERSION = 1
+_MOVES = "UDLR"
+ROOT = -1  # move of the initial board
+_ROOT_CODE = 4
+_CLOSED = 0x80
+_NO_BOUND = 0xFFFFFFFF  # no f over the threshold found yet (inf)
+
+
+def tile_bits(n: int) -> int:
+    return max(4, (n * n - 1).bit_length())
+
+
+def pack(tiles, bits: int) -> bytes:
+    """Tiles packed in bits each, the first tile in the lowest bits"""
+    packed = 0
+    for idx, tile in enumerate(tiles):
+        packed |= tile << (idx * bits)
+    return packed.to_bytes((len(tiles) * bits + 7) // 8, "little")
+
+
+def unpack(data: bytes, cells: int, bits: int) -> list[int]:
+    packed = int.from_bytes(data, "little")
+    mask = (1 << bits) - 1
+    return [(packed >> (idx * bits)) & mask for idx in range(cells)]
+
+
+class Counters(NamedTuple):
+    expanded: int
+    generated: int
+    duplicates: int
+    max_open: int
+
+
+class AStarCheckpoint(NamedTuple):
+    """
+    State of an A* search
+    records: (tiles, g, move, closed) of every board known by the search, move
+             is the index in U, D, L, R of the move that reached it (ROOT for
+             the initial board)
+    """
+
+    n: int
+    goal: list[int]
+    packed: bool  # the search used PackedBoard instead of Board
+    initial: list[int]
+    counters: Counters
+    records: list[tuple[list[int], int, int, bool]]
+
+    def save(self, path):
+        bits = tile_bits(self.n)
+        data = bytearray(_header(_ASTAR, self))
+        data += struct.pack("<Q", len(self.records))
+        for tiles, g, move, closed in self.records:
+            code = _ROOT_CODE if move == ROOT else move
+            data += pack(tiles, bits)
+            data += struct.pack("<HB", g, code | (_CLOSED if closed else 0))
+        _write(path, data)
+
+
+class IDAStarCheckpoint(NamedTuple):
+    """
+    State of an IDA* search
+    stack:  positions of the blank tile after each move of the current path
+    minima: smallest f over the threshold of the branches already searched at
+            each level of the stack (inf when there is none yet)
+    """
+
+    n: int
+    goal: list[int]
+    packed: bool
+    initial: list[int]
+    counters: Counters
+    threshold: int
+    stack: list[int]
+    minima: list[float]
+
+    def save(self, path):
+        data = bytearray(_header(_IDASTAR, self))
+        data += struct.pack("<II", self.threshold, len(self.stack))
+        data += bytes(self.stack)
+        for minimum in self.minima:
+            data += struct.pack("<I", _NO_BOUND if minimum == inf else minimum)
+        _write(path, data)
+
+
+def _header(magic: bytes, checkpoint) -> bytes:
+    return (
+        magic
+        + struct.pack("<BBBx", _VERSION, checkpoint.n, checkpoint.packed)
+        + bytes(checkpoint.goal)
+        + bytes(checkpoint.initial)
+        + struct.pack("<4Q", *checkpoint.counters)
+    )
+
+
+def _write(path, data: bytes):
+    """Write the file under another name and rename it, the rename is atomic"""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load(path, records: bool = True):
+    """
+    Read an AStarCheckpoint or an IDAStarCheckpoint, without records the boards
+    of an A* checkpoint are not read (e.g. to know which board it solves)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic = data[:4]
+    if magic not in (_ASTAR, _IDASTAR) or len(data) < 8 or data[4] != _VERSION:
+        raise ValueError(f"{path} is not a checkpoint file")
+    n, packed = data[5], bool(data[6])
+    cells = n * n
+    offset = 8
+    goal = list(data[offset : offset + cells])
+    initial = list(data[offset + cells : offset + 2 * cells])
+    offset += 2 * cells
+    try:
+        counters = Counters(*struct.unpack_from("<4Q", data, offset))
+        offset += 32
+        if magic == _ASTAR:
+            bits = tile_bits(n)
+            width = (cells * bits + 7) // 8
+            (count,) = struct.unpack_from("<Q", data, offset)
+            offset += 8
+            if len(data) < offset + count * (width + 3):
+                raise struct.error
+            boards = []
+            for _ in range(count if records else 0):
+                tiles = unpack(data[offset : offset + width], cells, bits)
+                g, code = struct.unpack_from("<HB", data, offset + width)
+                offset += width + 3
+                move = ROOT if code & 0x07 == _ROOT_CODE else code & 0x07
+                boards.append((tiles, g, move, bool(code & _CLOSED)))
+            return AStarCheckpoint(n, goal, packed, initial, counters, boards)
+        threshold, depth = struct.unpack_from("<II", data, offset)
+        offset += 8
+        stack = list(data[offset : offset + depth])
+        offset += depth
+        minima = [
+            inf if value == _NO_BOUND else value
+            for value in struct.unpack_from(f"<{depth}I", data, offset)
+        ]
+        return IDAStarCheckpoint(
+            n, goal, packed, initial, counters, threshold, stack, minima
+        )
+    except struct.error:
+        raise ValueError(f"{path} is truncated") from None
+
+
+def move_index(move: str) -> int:
+    return _MOVES.index(move)
+
+
+def move_of(index: int) -> str:
+    return _MOVES[index]
@@ -0,0 +1,232 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+import stateTable
+from board import PackedBoard, count_inversions, move_target, solvable, standard_goal
+from solver import HeuristicDistance, SearchAborted, SearchAlgorithm, Solver
+
+# *****************************************************************************
+#  Execution:    python generator.py [options] n count
+#  Dependencies: board.py solver.py stateTable.py
+#
+#  Random boards for load tests, always solvable and with a controlled number
+#  of moves. Two ways of drawing a board:
+#
+#  - walk:    random moves of the blank tile from the goal board, never undoing
+#             the last move. The board needs at most as many moves as the walk
+#             and the same parity of moves, so the length of the walk is tuned
+#             while the boards are drawn to land on the requested range.
+#  - uniform: a random permutation of the tiles, when it can't reach the goal
+#             two tiles (not the blank tile) are exchanged, which flips its
+#             parity. Every solvable board is equally likely (the hard ones are
+#             the most common, e.g. 4x4 boards need about 52 moves).
+#
+#  The minimum number of moves of each board is verified (the tables of
+#  stateTable.py up to 3x3, IDA* with linear conflicts above) and the boards
+#  out of the range are drawn again. A board whose verification takes longer
+#  than verify_timeout is dropped. Without verification (e.g. 5x5 boards) the
+#  number of moves written is the length of the walk, an upper bound.
+#
+#  Board i of a dataset depends only on the seed and i, so a dataset can be
+#  regenerated (or extended) exactly.
+#
+#  Examples:
+#  python generator.py 4 100 --moves 30-40 --seed 7 --output source_data/load4x4
+#  python generator.py 5 1000 --moves 60-80 --no-verify --output boards5x5.jsonl
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+METHODS = ("walk", "uniform")
+
+
+class Instance(NamedTuple):
+    """
+    A generated board
+    index:    position in the dataset
+    blocks:   the rows of the board
+    moves:    minimum number of moves (an upper bound when verified is False)
+    verified: the number of moves was computed by a solver
+    """
+
+    index: int
+    blocks: list[list[int]]
+    moves: int
+    verified: bool
+
+
+def _rows(n: int, tiles: list[int]) -> list[list[int]]:
+    return [tiles[i * n : (i + 1) * n] for i in range(n)]
+
+
+def random_walk(n: int, length: int, rng: random.Random) -> list[list[int]]:
+    """Board reached by length random moves from the goal without backtracking"""
+    tiles = [tile for row in standard_goal(n) for tile in row]
+    blank, previous = n * n - 1, -1
+    for _ in range(length):
+        targets = []
+        for move in "UDLR":
+            try:
+                target = move_target(n, blank, move)
+            except ValueError:
+                continue  # the move takes the blank tile out of the board
+            if target != previous:
+                targets.append(target)
+        target = rng.choice(targets)
+        tiles[blank], tiles[target] = tiles[target], 0
+        blank, previous = target, blank
+    return _rows(n, tiles)
+
+
+def uniform(n: int, rng: random.Random) -> list[list[int]]:
+    """Uniformly random solvable board (parity fixed by exchanging two tiles)"""
+    tiles = list(range(n * n))
+    rng.shuffle(tiles)
+    if not solvable(n, count_inversions(tiles), tiles.index(0) // n):
+        i, j = [k for k, tile in enumerate(tiles) if tile != 0][:2]
+        tiles[i], tiles[j] = tiles[j], tiles[i]
+    return _rows(n, tiles)
+
+
+def minimum_moves(blocks, timeout: Optional[float] = None) -> Optional[int]:
+    """Minimum number of moves of a board, None when it takes over timeout seconds"""
+    board = PackedBoard(blocks)
+    if board.dimension() <= stateTable.MAX_SIZE:
+        return stateTable.for_size(board.dimension()).distance(board)
+    try:
+        solver = Solver(
+            board,
+            HeuristicDistance.LINEAR_CONFLICT,
+            SearchAlgorithm.IDASTAR,
+            timeout=timeout,
+        )
+    except SearchAborted:
+        return None
+    return solver.number_of_moves()
+
+
+def generate(
+    n: int,
+    count: int,
+    low: int,
+    high: int,
+    seed: int = 0,
+    method: str = "walk",
+    verify: bool = True,
+    verify_timeout: Optional[float] = 10.0,
+) -> Iterator[Instance]:
+    """
+    Yield count boards of size n that need from low to high moves (both
+    included). uniform boards are only kept when they are verified in range
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    if not 0 <= low <= high:
+        raise ValueError("the range of moves must satisfy 0 <= low <= high")
+    if method == "uniform" and not verify:
+        raise ValueError("uniform boards need verify to know their number of moves")
+    for index in range(count):
+        rng = random.Random(f"{seed}-{index}")
+        length = high  # longest walk, it grows when the boards fall short
+        attempts = 0
+        while True:
+            attempts += 1
+            if attempts > 10_000:
+                raise ValueError(f"no {n}x{n} board found between {low} and {high}")
+            if method == "uniform":
+                blocks = uniform(n, rng)
+            else:
+                walk = rng.randint(low, length) if verify else rng.randint(low, high)
+                blocks = random_walk(n, walk, rng)
+            if not verify:
+                yield Instance(index, blocks, walk, False)
+                break
+            moves = minimum_moves(blocks, verify_timeout)
+            if moves is None:
+                continue
+            if low <= moves <= high:
+                yield Instance(index, blocks, moves, True)
+                break
+            if moves < low and method == "walk":
+                length += 1  # the walks fold back on themselves, make them longer
+
+
+def write_text(instance: Instance, folder: Path, n: int) -> Path:
+    """Write a board in the format of the source_data files"""
+    path = folder / f"puzzle{n}x{n}-{instance.moves:02d}-{instance.index:05d}.txt"
+    width = len(str(n * n - 1))
+    rows = "\n".join(
+        " ".join(f"{tile:>{width}}" for tile in row) for row in instance.blocks
+    )
+    path.write_text(f"{n}\n{rows}\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Random solvable n-puzzle boards")
+    parser.add_argument("n", type=int, help="size of the boards")
+    parser.add_argument("count", type=int, help="number of boards")
+    parser.add_argument("--moves", default="20-30", help="range of moves, e.g. 20-30")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--method", choices=METHODS, default="walk")
+    parser.add_argument(
+        "--no-verify",
+        action="store_true",
+        help="don't solve the boards, the moves written are the length of the walk",
+    )
+    parser.add_argument(
+        "--verify-timeout", type=float, default=10.0, help="seconds per board"
+    )
+    parser.add_argument(
+        "--output",
+        default="source_data/generated",
+        help="folder of text files, or a .jsonl file (- for the standard output)",
+    )
+    args = parser.parse_args()
+    low, _, high = args.moves.partition("-")
+    low, high = int(low), int(high or low)
+
+    instances = generate(
+        args.n,
+        args.count,
+        low,
+        high,
+        args.seed,
+        args.method,
+        not args.no_verify,
+        args.verify_timeout,
+    )
+    start = time.perf_counter()
+    jsonl = args.output == "-" or args.output.endswith(".jsonl")
+    if jsonl:
+        out = sys.stdout if args.output == "-" else open(args.output, "w")
+    else:
+        folder = Path(args.output)
+        folder.mkdir(parents=True, exist_ok=True)
+    try:
+        for instance in instances:
+            if jsonl:
+                record = {
+                    "blocks": instance.blocks,
+                    "moves": instance.moves,
+                    "verified": instance.verified,
+                    "seed": args.seed,
+                    "index": instance.index,
+                }
+                out.write(json.dumps(record) + "\n")
+            else:
+                write_text(instance, folder, args.n)
+    finally:
+        if jsonl and out is not sys.stdout:
+            out.close()
+    seconds = time.perf_counter() - start
+    print(f"{args.count} boards in {seconds:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import argparse
+import multiprocessing
+import os
+import time
+from functools import partial
+from heapq import heappop, heappush
+from queue import Empty
+from typing import Optional
+
+from board import PackedBoard
+
+# *****************************************************************************
+#  Execution:    python hdaStar.py [--workers 1,2,4,8] [--heuristic NAME] path ...
+#  Dependencies: board.py (solver.py for the command line)
+#
+#  Hash distributed A* (HDA*) for the n-puzzle game.
+#
+#  Every board has an owner worker process given by a hash of its packed tiles,
+#  and only the owner keeps it in its open and closed lists. A worker expands
+#  its best board and sends each child to its owner; the children of the same
+#  owner are grouped in batches so the queues between processes carry a few
+#  big messages instead of many small ones.
+#
+#  The workers share the cost of the best solution found so far (incumbent).
+#  A worker whose open list has nothing better than the incumbent is idle. The
+#  search ends when every worker is idle and no batch is on its way, which is
+#  detected by counting the batches sent and received by each worker: the
+#  counters are read twice, and the search ends only when both readings are
+#  equal, all the workers were idle and every batch sent was received. At that
+#  point every board with f lower than the incumbent was expanded, so (with an
+#  admissible heuristic) the incumbent is optimal.
+#
+#  The path is retrieved asking the owner of each board for its parent, from
+#  the goal back to the initial board.
+#
+#  The batches travel through multiprocessing.Queue pipes (pickled lists of
+#  (tiles, g, h, parent) tuples), not shared memory, on purpose: a board is a
+#  few small ints, so a batch of 64 is one short message, and the queues already
+#  block, wake up the receiver and keep the messages in order. A shared memory
+#  ring per pair of workers would need fixed size records, its own locks or
+#  sequence numbers and a way to wait without spinning, for workers ** 2 rings.
+#  Only the small state read by every worker on every loop is shared memory
+#  (the incumbent, the lowest f of each open list, the batch counters and the
+#  busy flags).
+#
+#  The speedup needs a core per worker: with fewer cores the extra workers only
+#  add the cost of the messages.
+#
+#  Example:
+#  python hdaStar.py --workers 1,2,4,8 source_data/puzzle4x4-78.txt
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+_ROOT = -1  # parent of the initial board
+_NONE = 1 << 62  # incumbent while no solution was found
+
+
+def owner(tiles: int, workers: int) -> int:
+    """Worker that owns a board (a multiplicative hash spreads similar boards)"""
+    return ((hash(tiles) * 0x9E3779B97F4A7C15) >> 40) % workers
+
+
+def _decode(tiles: int, n: int, bits: int) -> list[list[int]]:
+    mask = (1 << bits) - 1
+    return [
+        [(tiles >> ((i * n + j) * bits)) & mask for j in range(n)] for i in range(n)
+    ]
+
+
+class WorkerError(RuntimeError):
+    """A worker process raised or was killed, the search can't go on"""
+
+
+def _worker(index, workers, goal, heuristic, batch_size, inboxes, results, shared):
+    """Worker process, the coordinator gets the error when the search fails"""
+    try:
+        _search(index, workers, goal, heuristic, batch_size, inboxes, results, shared)
+    except BaseException as e:
+        results.put(("error", index, f"{type(e).__name__}: {e}"))
+        raise
+
+
+def _search(index, workers, goal, heuristic, batch_size, inboxes, results, shared):
+    """Search loop of a worker process"""
+    counters, incumbent, lock = shared
+    n = len(goal)
+    tables = PackedBoard(goal, goal).tables
+    inbox = inboxes[index]
+    sent, received, busy = index, workers + index, 2 * workers + index
+    frontier = 3 * workers + index
+    closed: dict[int, tuple[int, int]] = {}  # tiles: (moves, parent tiles)
+    heap: list = []  # (f, -moves, tiles)
+    outboxes: list[list] = [[] for _ in range(workers)]
+    expanded = generated = duplicates = max_open = 0
+
+    def flush(target):
+        counters[sent] += 1
+        inboxes[target].put(outboxes[target])
+        outboxes[target] = []
+
+    def add(tiles, moves, h, parent):
+        nonlocal duplicates
+        known = closed.get(tiles)
+        if known is not None and known[0] <= moves:
+            duplicates += 1
+            return
+        closed[tiles] = (moves, parent)
+        if tiles == tables.goal:
+            with lock:
+                if moves < incumbent.value:
+                    incumbent.value = moves
+        elif moves + h < incumbent.value:
+            heappush(heap, (moves + h, -moves, tiles))
+
+    def lowest() -> int:
+        """Publish the lowest f of the open list, return the lowest of all workers"""
+        best = heap[0][0] if len(heap) > 0 and heap[0][0] < incumbent.value else _NONE
+        counters[frontier] = best
+        return min(counters[3 * workers :])
+
+    while True:
+        # the workers expand the same f layer at the same time, a worker that is
+        # ahead of the others waits for them instead of expanding boards that A*
+        # would never expand
+        bound = lowest()
+        best = counters[frontier]
+        if best == _NONE or best > bound:
+            for target in range(workers):
+                if outboxes[target]:
+                    flush(target)
+            if best == _NONE:
+                counters[busy] = 0  # nothing better than the incumbent
+            try:
+                message = inbox.get(timeout=0.001)
+            except Empty:
+                continue
+        else:
+            try:
+                message = inbox.get_nowait()
+            except Empty:
+                message = None
+        if message == "stop":
+            break
+        if isinstance(message, tuple):  # the coordinator asks for a parent
+            results.put(("parent", closed[message[1]][1]))
+            continue
+        if message is not None:
+            counters[busy] = 1  # busy before the batch is counted as received
+            counters[received] += 1
+            for tiles, moves, h, parent in message:
+                add(tiles, moves, h, parent)
+        max_open = max(max_open, len(heap))
+        bound = min(lowest(), incumbent.value - 1)
+        for _ in range(batch_size):
+            if len(heap) == 0 or heap[0][0] > bound:
+                break
+            f, moves, tiles = heappop(heap)
+            moves = -moves
+            if closed[tiles][0] != moves:
+                continue  # stale entry, the board was reached later with less moves
+            expanded += 1
+            board = PackedBoard(_decode(tiles, n, tables.bits), goal)
+            heuristic(board)  # the children update linear conflicts incrementally
+            parent = closed[tiles][1]
+            for child in board.neighbors():
+                if child.tiles == parent:
+                    continue  # moving the blank tile back only undoes the last move
+                generated += 1
+                target = owner(child.tiles, workers)
+                entry = (child.tiles, moves + 1, heuristic(child), tiles)
+                if target == index:
+                    add(*entry)
+                else:
+                    outboxes[target].append(entry)
+                    if len(outboxes[target]) >= batch_size:
+                        flush(target)
+        # the children wait at most one round, the other workers may need them to
+        # keep their open lists in order
+        for target in range(workers):
+            if outboxes[target]:
+                flush(target)
+    results.put(("stats", expanded, generated, duplicates, max_open))
+
+
+class HDAStar(object):
+    """
+    Hash distributed A* over worker processes
+    board:      initial board (Board or PackedBoard)
+    heuristic:  admissible heuristic, function of a PackedBoard (it is sent to the
+                workers, so it must be picklable, e.g. a functools.partial)
+    workers:    number of worker processes (one per core by default)
+    batch_size: children grouped in a message, also the number of boards a
+                worker expands between two reads of its queue
+    stats:      SearchStats updated with the sum of the counters of the workers
+    search() raises WorkerError when a worker fails (e.g. its heuristic raises,
+    it runs out of memory or it is killed) instead of waiting for it forever
+    """
+
+    def __init__(self, board, heuristic, workers=None, batch_size=64, stats=None):
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.board = board
+        self.heuristic = heuristic
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.stats = stats
+
+    def search(self) -> Optional[list[int]]:
+        """
+        Positions of the blank tile from the initial board to the goal, None when
+        the goal can't be reached
+        """
+        goal = self.board.goal_blocks()
+        start = PackedBoard(self.board.blocks(), goal)
+        tables = start.tables
+        if start.is_goal():
+            return [start.blank]
+        workers = self.workers
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(workers)]
+        results = context.Queue()
+        # sent, received and busy flag of each worker (each one writes only its own)
+        # and the lowest f of its open list
+        counters = context.RawArray("q", [0] * (3 * workers) + [_NONE] * workers)
+        incumbent = context.RawValue("q", _NONE)
+        shared = (counters, incumbent, context.Lock())
+        processes = [
+            context.Process(
+                target=_worker,
+                args=(
+                    index,
+                    workers,
+                    goal,
+                    self.heuristic,
+                    self.batch_size,
+                    inboxes,
+                    results,
+                    shared,
+                ),
+                daemon=True,
+            )
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            root = (start.tiles, 0, self.heuristic(start), _ROOT)
+            inboxes[owner(start.tiles, workers)].put([root])
+            self.__wait(counters, workers, processes, results, coordinator_sent=1)
+            path = None
+            if incumbent.value != _NONE:
+                path = [tables.goal]
+                while path[-1] != start.tiles:
+                    inboxes[owner(path[-1], workers)].put(("parent", path[-1]))
+                    path.append(_result(results, processes)[1])
+                path.reverse()
+            for inbox in inboxes:
+                inbox.put("stop")
+            for _ in range(workers):
+                _, expanded, generated, duplicates, max_open = _result(
+                    results, processes
+                )
+                if self.stats is not None:
+                    self.stats.expanded += expanded
+                    self.stats.generated += generated
+                    self.stats.duplicates += duplicates
+                    self.stats.max_open = max(self.stats.max_open, max_open)
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()  # e.g. the search was interrupted
+        if path is None:
+            return None
+        return [_decode_blank(tiles, tables) for tiles in path]
+
+    @staticmethod
+    def __wait(counters, workers: int, processes, results, coordinator_sent: int):
+        """Wait until every worker is idle and no batch is on its way"""
+        previous = None
+        while True:
+            time.sleep(0.001)
+            _check(processes, results)
+            received = sum(counters[workers : 2 * workers])
+            sent = sum(counters[:workers]) + coordinator_sent
+            idle = not any(counters[2 * workers : 3 * workers])
+            snapshot = (sent, received)
+            if idle and sent == received and snapshot == previous:
+                return
+            previous = snapshot if idle and sent == received else None
+
+
+def _check(processes, results):
+    """Raise WorkerError when a worker ended before it was asked to stop"""
+    for index, process in enumerate(processes):
+        if process.exitcode not in (None, 0):
+            try:
+                # the error sent by the worker, unless it was killed
+                message = results.get(timeout=1.0)
+            except Empty:
+                message = None
+            if message is not None and message[0] == "error":
+                raise WorkerError(f"worker {message[1]} failed: {message[2]}")
+            raise WorkerError(f"worker {index} ended with exit code {process.exitcode}")
+
+
+def _result(results, processes):
+    """Next message of the workers, checking that they are still alive"""
+    while True:
+        try:
+            message = results.get(timeout=0.1)
+        except Empty:
+            _check(processes, results)
+            continue
+        if message[0] == "error":
+            raise WorkerError(f"worker {message[1]} failed: {message[2]}")
+        return message
+
+
+def _decode_blank(tiles: int, tables) -> int:
+    """Position of the blank tile in the packed tiles"""
+    idx = 0
+    while tiles & tables.mask:
+        tiles >>= tables.bits
+        idx += 1
+    return idx
+
+
+def main():
+    from loader import read_blocks
+    from solver import HeuristicDistance, heuristic_distance
+
+    parser = argparse.ArgumentParser(description="Speedup of HDA* with the workers")
+    parser.add_argument("paths", nargs="+", help="puzzle files")
+    parser.add_argument("--workers", default="1,2,4,8", help="e.g. 1,2,4,8")
+    parser.add_argument(
+        "--heuristic",
+        choices=[h.name for h in HeuristicDistance],
+        default=HeuristicDistance.LINEAR_CONFLICT.name,
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    heuristic = partial(
+        heuristic_distance, heuristic=HeuristicDistance[args.heuristic]
+    )
+    for path in args.paths:
+        board = PackedBoard(read_blocks(path))
+        baseline = None
+        for workers in [int(w) for w in args.workers.split(",")]:
+            start = time.perf_counter()
+            blanks = HDAStar(board, heuristic, workers, args.batch_size).search()
+            seconds = time.perf_counter() - start
+            baseline = seconds if baseline is None else baseline
+            moves = -1 if blanks is None else len(blanks) - 1
+            print(
+                f"{os.path.basename(path)}: {workers} workers {moves} moves "
+                f"{seconds:.3f} s speedup {baseline / seconds:.2f}x",
+                flush=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
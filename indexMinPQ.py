@@ -0,0 +1,169 @@
+import random
+from array import array
+from math import inf
+
+#******************************************************************************/
+#  Indexed min priority queue
+#
+#  @author Eduardo Ch. Colorado
+#******************************************************************************/
+
+#   INDEXED PRIORITY QUEUE
+# The items of the queue are integer handles (0, 1, 2...) chosen by the client,
+# e.g. the number given to each board the first time the solver sees it, and
+# each one has an integer key. Knowing where every handle sits in the heap lets
+# us change the key of an item that is already in the queue: when the solver
+# finds a shorter path to a board waiting in the open list it lowers its key
+# in place instead of inserting the board again.
+#
+# Three parallel arrays (the array module, no Python object per entry):
+#
+#    pq[k]     handle at the position k of the heap (the entry 0 is ignored,
+#              like in minPQ.py the children of k are 2k and 2k + 1)
+#    qp[i]     position of the handle i in the heap, 0 if it is not in the queue
+#    keys[i]   key of the handle i
+#
+#    pq      -   3   0   2         keys[pq[1]] <= keys of its children
+#    qp      2   0   3   1         qp[pq[k]] = k
+#    keys    5   9   7   1
+#
+# swim and sink move a "hole" instead of exchanging pairs: the moving handle is
+# written once at its final position. heapify builds the queue of n handles in
+# O(n) sinking the internal nodes from the last one to the root.
+
+
+class IndexMinPQ(object):
+    def __init__(self):
+        self.pq = array("l", [0])
+        self.qp = array("l")
+        self.keys = array("q")
+        self.N = 0
+
+    @classmethod
+    def heapify(cls, keys) -> "IndexMinPQ":
+        """Queue with the handles 0 to len(keys) - 1, the handle i with keys[i]"""
+        queue = cls()
+        n = len(keys)
+        queue.keys = array("q", keys)
+        queue.pq = array("l", range(-1, n))  # pq[k] = k - 1
+        queue.qp = array("l", range(1, n + 1))
+        queue.N = n
+        for k in range(n // 2, 0, -1):
+            queue.__sink(k)
+        return queue
+
+    def insert(self, i: int, key: int):
+        if i < 0:
+            raise ValueError("the handles must be non negative")
+        if i >= len(self.qp):
+            grow = max(i + 1, 2 * len(self.qp)) - len(self.qp)
+            self.qp.extend([0] * grow)
+            self.keys.extend([0] * grow)
+        if self.qp[i] != 0:
+            raise ValueError(f"the handle {i} is already in the priority queue")
+        self.N += 1
+        self.keys[i] = key
+        self.pq.append(i)
+        self.__swim(self.N, i)
+
+    def decreaseKey(self, i: int, key: int):
+        """Lower the key of a handle in the queue (the same key is allowed)"""
+        if not self.contains(i):
+            raise ValueError(f"the handle {i} is not in the priority queue")
+        if key > self.keys[i]:
+            raise ValueError("decreaseKey can't raise the key of a handle")
+        self.keys[i] = key
+        self.__swim(self.qp[i], i)
+
+    def delMin(self) -> int:
+        """Remove the handle with the lowest key and return it"""
+        # raise a underflow exception if the priority queue is empty
+        if self.N == 0:
+            raise Exception("Priority queue underflow")
+        pq = self.pq
+        i = pq[1]
+        last = pq.pop()
+        self.N -= 1
+        self.qp[i] = 0
+        if self.N > 0:
+            pq[1] = last
+            self.__sink(1)
+        return i
+
+    def minIndex(self) -> int:
+        return self.pq[1]
+
+    def minKey(self) -> int:
+        return self.keys[self.pq[1]]
+
+    def keyOf(self, i: int) -> int:
+        return self.keys[i]
+
+    def contains(self, i: int) -> bool:
+        return 0 <= i < len(self.qp) and self.qp[i] != 0
+
+    def size(self):
+        return self.N
+
+    def isEmpty(self):
+        return self.N == 0
+
+    def __swim(self, k: int, i: int):
+        """Move the handle i up from the position k"""
+        pq, qp, keys = self.pq, self.qp, self.keys
+        key = keys[i]
+        while k > 1:
+            parent = pq[k >> 1]
+            if keys[parent] <= key:
+                break
+            pq[k] = parent
+            qp[parent] = k
+            k >>= 1
+        pq[k] = i
+        qp[i] = k
+
+    def __sink(self, k: int):
+        """Move the handle at the position k down"""
+        pq, qp, keys = self.pq, self.qp, self.keys
+        N = self.N
+        i = pq[k]
+        key = keys[i]
+        while 2 * k <= N:
+            j = 2 * k
+            child = pq[j]
+            if j < N and keys[pq[j + 1]] < keys[child]:
+                j += 1
+                child = pq[j]
+            if key <= keys[child]:
+                break
+            pq[k] = child
+            qp[child] = k
+            k = j
+        pq[k] = i
+        qp[i] = k
+
+
+if __name__ == "__main__":
+    # randomized check against a dictionary of the keys
+    rng = random.Random(2024)
+    for _ in range(500):
+        pq, keys = IndexMinPQ(), {}
+        for _ in range(rng.randint(1, 300)):
+            operation = rng.random()
+            if operation < 0.5:
+                i = rng.randrange(100)
+                if i not in keys:
+                    keys[i] = rng.randint(-50, 100)
+                    pq.insert(i, keys[i])
+            elif operation < 0.75 and keys:
+                i = rng.choice(list(keys))
+                keys[i] -= rng.randint(0, 10)
+                pq.decreaseKey(i, keys[i])
+            elif keys:
+                i = pq.delMin()
+                assert keys.pop(i) <= min(keys.values(), default=inf)
+            assert pq.size() == len(keys) and all(pq.contains(i) for i in keys)
+        values = [rng.randint(0, 100) for _ in range(rng.randint(1, 100))]
+        pq = IndexMinPQ.heapify(values)
+        assert [values[pq.delMin()] for _ in values] == sorted(values)
+    print("ok")
@@ -0,0 +1,261 @@
+import glob
+import json
+import os
+import sys
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from board import count_inversions, solvable
+
+# *****************************************************************************
+#  Execution:    python loader.py path [path ...]
+#  Dependencies: board.py
+#
+#  Streaming reader of puzzle files. The boards are read one at a time (the
+#  files are never loaded whole) and every board is validated as soon as it is
+#  read, so a bad record is reported with its file and line instead of reaching
+#  the solver.
+#
+#  Text format (the format of the source_data files), one or more boards per
+#  file, each one is the size n followed by n rows of n tiles (0 is the blank):
+#
+#      3
+#      0  1  3
+#      4  2  5
+#      7  8  6
+#
+#  any amount of spaces separates the tiles, and blank lines are ignored.
+#
+#  JSONL format (files ending in .jsonl), one board per line, either the list
+#  of rows or an object with the rows in "blocks":
+#
+#      [[0, 1, 3], [4, 2, 5], [7, 8, 6]]
+#      {"blocks": [[1, 2], [0, 3]]}
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+MIN_SIZE = 2
+MAX_SIZE = 16  # Board.key() stores each tile in one byte
+
+
+class PuzzleFormatError(ValueError):
+    """A record that is not a valid board, with the file and line where it starts"""
+
+    def __init__(self, source: str, line: int, message: str):
+        super().__init__(f"{source}:{line}: {message}")
+        self.source = source
+        self.line = line
+        self.message = message
+
+
+class PuzzleRecord(NamedTuple):
+    """
+    A board read from a file
+    source:   the file
+    line:     line of the file where the board starts
+    blocks:   the rows of the board (None when the record is invalid)
+    solvable: True if the goal board can be reached
+    error:    None, or the reason why the record is invalid (non strict loads)
+    """
+
+    source: str
+    line: int
+    blocks: Optional[list[list[int]]]
+    solvable: bool = False
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """The file, plus the line when the file may have other boards"""
+        if self.line == 1 and not self.source.endswith(".jsonl"):
+            return self.source
+        return f"{self.source}:{self.line}"
+
+
+def validate(blocks, source: str = "<board>", line: int = 1) -> list[list[int]]:
+    """
+    Check that blocks is a n x n board with each tile from 0 to n*n - 1 once,
+    return it as a list of lists of ints or raise PuzzleFormatError
+    """
+    if not isinstance(blocks, list) or len(blocks) == 0:
+        raise PuzzleFormatError(source, line, "a board must be a list of rows")
+    n = len(blocks)
+    if not MIN_SIZE <= n <= MAX_SIZE:
+        raise PuzzleFormatError(
+            source, line, f"size {n} out of range ({MIN_SIZE} to {MAX_SIZE})"
+        )
+    for i, row in enumerate(blocks):
+        if not isinstance(row, list) or len(row) != n:
+            found = len(row) if isinstance(row, list) else type(row).__name__
+            raise PuzzleFormatError(
+                source, line, f"row {i + 1} must have {n} tiles, found {found}"
+            )
+        if any(type(tile) is not int for tile in row):
+            raise PuzzleFormatError(
+                source, line, f"row {i + 1} has a tile that is not an integer"
+            )
+    seen = [False] * (n * n)
+    for i, row in enumerate(blocks):
+        for tile in row:
+            if not 0 <= tile < n * n:
+                raise PuzzleFormatError(
+                    source, line, f"tile {tile} out of range (0 to {n * n - 1})"
+                )
+            if seen[tile]:
+                raise PuzzleFormatError(source, line, f"tile {tile} is repeated")
+            seen[tile] = True
+    return blocks
+
+
+def _record(blocks, source: str, line: int) -> PuzzleRecord:
+    blocks = validate(blocks, source, line)
+    n = len(blocks)
+    tiles = [tile for row in blocks for tile in row]
+    blank_row = tiles.index(0) // n
+    return PuzzleRecord(
+        source, line, blocks, solvable(n, count_inversions(tiles), blank_row)
+    )
+
+
+def _integers(text: str, source: str, line: int) -> list[int]:
+    try:
+        return [int(token) for token in text.split()]
+    except ValueError:
+        message = f"expected integers, found {text.strip()!r}"
+        raise PuzzleFormatError(source, line, message) from None
+
+
+def parse_text(lines: Iterable[str], source: str = "<text>") -> Iterator[PuzzleRecord]:
+    """Boards of the text format, raise PuzzleFormatError on the first bad one"""
+    numbered = ((number, text) for number, text in enumerate(lines, 1) if text.strip())
+    for number, text in numbered:
+        header = _integers(text, source, number)
+        if len(header) != 1:
+            found = text.strip()
+            raise PuzzleFormatError(
+                source, number, f"expected the size of the board, found {found!r}"
+            )
+        n = header[0]
+        if not MIN_SIZE <= n <= MAX_SIZE:
+            raise PuzzleFormatError(
+                source, number, f"size {n} out of range ({MIN_SIZE} to {MAX_SIZE})"
+            )
+        blocks = []
+        for i in range(n):
+            row = next(numbered, None)
+            if row is None:
+                raise PuzzleFormatError(
+                    source, number, f"expected {n} rows, the file ends after {i}"
+                )
+            tiles = _integers(row[1], source, row[0])
+            if len(tiles) != n:
+                raise PuzzleFormatError(
+                    source, row[0], f"expected {n} tiles, found {len(tiles)}"
+                )
+            blocks.append(tiles)
+        yield _record(blocks, source, number)
+
+
+def parse_jsonl(
+    lines: Iterable[str], source: str = "<jsonl>", strict: bool = True
+) -> Iterator[PuzzleRecord]:
+    """
+    Boards of the JSONL format, strict raises PuzzleFormatError on the first bad
+    one, otherwise a bad line is yielded with its error and the next lines are
+    read (each line is a record on its own)
+    """
+    for number, text in enumerate(lines, 1):
+        if not text.strip():
+            continue
+        try:
+            yield _jsonl_record(text, source, number)
+        except PuzzleFormatError as e:
+            if strict:
+                raise
+            yield PuzzleRecord(e.source, e.line, None, error=e.message)
+
+
+def _jsonl_record(text: str, source: str, number: int) -> PuzzleRecord:
+    try:
+        value = json.loads(text)
+    except json.JSONDecodeError as e:
+        message = f"invalid JSON ({e.msg})"
+        raise PuzzleFormatError(source, number, message) from None
+    if isinstance(value, dict):
+        if "blocks" not in value:
+            raise PuzzleFormatError(source, number, 'the object has no "blocks"')
+        value = value["blocks"]
+    return _record(value, source, number)
+
+
+def read_file(path: str, strict: bool = True) -> Iterator[PuzzleRecord]:
+    """
+    Stream the boards of a file (JSONL if it ends in .jsonl, otherwise text),
+    strict as in parse_jsonl for JSONL files, a text file always raises
+    """
+    with open(path) as f:
+        if path.endswith(".jsonl"):
+            yield from parse_jsonl(f, path, strict)
+        else:
+            yield from parse_text(f, path)
+
+
+def read_blocks(path: str) -> list[list[int]]:
+    """The board of a file with a single board (the source_data files)"""
+    records = read_file(path)
+    record = next(records, None)
+    if record is None:
+        raise PuzzleFormatError(path, 1, "the file has no board")
+    records.close()
+    return record.blocks
+
+
+def expand_paths(paths: Iterable[str]) -> list[str]:
+    """Files named by the paths (directories and glob patterns are expanded)"""
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "puzzle*.txt"))))
+        elif glob.has_magic(path):
+            files.extend(sorted(glob.glob(path)))
+        else:
+            files.append(path)
+    return files
+
+
+def load(paths: Iterable[str], strict: bool = True) -> Iterator[PuzzleRecord]:
+    """
+    Stream the boards of many files (directories and glob patterns are expanded).
+    strict raises PuzzleFormatError (or OSError) on the first bad record,
+    otherwise a bad record is yielded with its error and the stream goes on
+    with the next line of a JSONL file, or with the next file for a text file
+    (the rest of a text file can't be trusted after a bad board)
+    """
+    for path in expand_paths(paths):
+        try:
+            yield from read_file(path, strict)
+        except PuzzleFormatError as e:
+            if strict:
+                raise
+            yield PuzzleRecord(e.source, e.line, None, error=e.message)
+        except OSError as e:
+            if strict:
+                raise
+            yield PuzzleRecord(path, 1, None, error=e.strerror or str(e))
+
+
+def main():
+    valid = unsolvable = invalid = 0
+    for record in load(sys.argv[1:], strict=False):
+        if record.error is not None:
+            invalid += 1
+            print(f"{record.name}: {record.error}")
+        elif not record.solvable:
+            unsolvable += 1
+        else:
+            valid += 1
+    print(f"{valid} solvable, {unsolvable} unsolvable, {invalid} invalid boards")
+
+
+if __name__ == "__main__":
+    main()
@@ -39,20 +39,33 @@ class MinPQ(object):
     def __init__(self):
         self.pq = [0]
         self.N = 0
-    
+
+    @classmethod
+    def heapify(cls, items) -> "MinPQ":
+        """Priority queue with all the items at once, O(n) instead of n inserts"""
+        queue = cls()
+        queue.pq = [0] + list(items)
+        queue.N = len(queue.pq) - 1
+        # the leaves are already heaps, the internal nodes are sunk from the last
+        # one up to the root
+        for k in range(queue.N // 2, 0, -1):
+            queue.__sink(k)
+        return queue
+
     def delMin(self):
         #raise a underflow exception if the priority queue is empty
         if(self.N == 0): raise Exception("Priority queue underflow")
         #Save the root value
         min_el = self.pq[1]
         #put the last element in the root
-        try:self.pq[1] = self.pq.pop()
-        except: pass
+        last = self.pq.pop()
         self.N -= 1
-        #"sink" the element to its rigth place
-        self.__sink(1)
+        if self.N > 0:
+            self.pq[1] = last
+            #"sink" the element to its rigth place
+            self.__sink(1)
         return min_el
-    
+
     def min(self):
         return self.pq[1]
 
@@ -60,41 +73,39 @@ class MinPQ(object):
         self.N += 1
         self.pq.append(x)
         self.__swim(self.N)
-        
 
     def size(self):
-        return self.N    
+        return self.N
+
+    # sink and swim compare the items inline and move a "hole" instead of
+    # exchanging pairs, the moving item is written once at its final position
 
     def __sink(self,k):
+        pq = self.pq
         # Last entry on the list
         N = self.N
+        x = pq[k]
         #we can sink the node k up to the last leaf (which is in the last entry of the list)
-        while(2*k <= N): 
+        while(2*k <= N):
             j = 2*k
-            # First we select the greatest of the two childs of the node k
-            if(j < N and self.__greater(j,j+1)): j += 1
-            # If the value of node k is not less than the value of the selected node we break the loop (the node k obey the heap oreder)
-            if(not self.__greater(k,j)): break
-            # if we don't break thw loop, we exchange the value of the child node with the value of the parent
-            self.__exch(k, j)
-            # finally we go up one level on the tree and repeate the process util we reach the root of the tree
+            # First we select the smallest of the two childs of the node k
+            if(j < N and pq[j+1] < pq[j]): j += 1
+            # If the selected child doesn't go before the item we break the loop (the node k obey the heap order)
+            if(not pq[j] < x): break
+            # if we don't break the loop, the child moves up into the hole
+            pq[k] = pq[j]
+            # finally we go down one level on the tree and repeate the process util we reach a leaf
             k = j
-            #when we left this iteration we will end up with a complete oredered binary heap
-
+        pq[k] = x
 
     def __swim(self, k):
-        while(k > 1 and self.__greater(k//2,k)): 
-            self.__exch(k, k // 2)
+        pq = self.pq
+        x = pq[k]
+        while(k > 1 and x < pq[k // 2]):
+            pq[k] = pq[k // 2]
             k = k // 2
+        pq[k] = x
 
-    def __greater(self, i, j):
-        return self.pq[j] < self.pq[i]
-
-    def __exch(self, i, j):
-        temp = self.pq[i]
-        self.pq[i] = self.pq[j]
-        self.pq[j] = temp
-        
 
 # pq = MinPQ()
 
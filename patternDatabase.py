@@ -0,0 +1,247 @@
+import mmap
+import os
+import struct
+import sys
+from collections import deque
+from pathlib import Path
+
+# *****************************************************************************
+#  Execution:    python patternDatabase.py n [pattern pattern ...]
+#  Dependencies: board.py
+#
+#  Disjoint additive pattern databases for the n-puzzle game.
+#  The tiles of the board are split in disjoint groups (patterns). For each
+#  pattern a breadth first search from the goal explores the abstracted board
+#  where only the tiles of the pattern are distinguishable, counting only the
+#  moves of those tiles. The minimum number of moves for every placement of the
+#  pattern is stored in a byte array, and because every move belongs to only
+#  one pattern the values of the different patterns can be added and still
+#  never overestimate the real number of moves.
+#
+#  Examples:
+#  python patternDatabase.py 4                      (default patterns 5-5-5)
+#  python patternDatabase.py 4 1,5,6,9,10,13 7,8,11,12,14,15 2,3,4   (6-6-3)
+#
+#  The databases are saved in a binary file that is memory mapped when loaded,
+#  so later processes use them without rebuilding or copying them.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+
+# A placement of a pattern with k tiles is indexed as a number in base n*n
+# where the i-th digit is the position of the i-th tile of the pattern
+#
+#    pattern (3, 7, 8)  placed at positions 5, 0, 12 in a 4x4 board
+#    index = 5 * 16^0 + 0 * 16^1 + 12 * 16^2 = 3077
+#
+# Some indexes are impossible placements (two tiles in the same position) and
+# they are never visited, but this layout makes lookups a handful of operations.
+
+DEFAULT_PATTERNS: dict[int, tuple[tuple[int, ...], ...]] = {
+    2: ((1, 2, 3),),
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 5, 6, 9), (3, 4, 7, 8, 11), (10, 12, 13, 14, 15)),
+    5: (
+        (1, 2, 6, 7),
+        (3, 4, 5, 8),
+        (9, 10, 14, 15),
+        (11, 12, 16, 17),
+        (13, 18, 19, 20),
+        (21, 22, 23, 24),
+    ),
+}
+
+_MAGIC = b"NPDB"
+_VERSION = 1
+_UNSEEN = 255
+
+
+def build_pattern(n: int, pattern: tuple[int, ...]) -> bytearray:
+    """
+    Breadth first search (0-1 BFS) over the abstracted boards of a pattern.
+    A state is a placement of the pattern tiles plus the position of the blank
+    tile; moving the blank over a tile of the pattern costs one move and
+    moving it over any other tile is free. The distance of a placement is the
+    minimum over all the blank positions
+    """
+    cells = n * n
+    k = len(pattern)
+    powers = [cells**i for i in range(k)]
+    adjacent = []
+    for idx in range(cells):
+        i, j = idx // n, idx % n
+        adjacent.append(
+            [i2 * n + j2 for i2, j2 in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1))
+             if 0 <= i2 < n and 0 <= j2 < n]
+        )
+    size = cells**k
+    distances = bytearray([_UNSEEN]) * (size * cells)
+    start = sum((tile - 1) * powers[i] for i, tile in enumerate(pattern))
+    start = start * cells + cells - 1  # the blank tile is placed in the last position
+    distances[start] = 0
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        distance = distances[state]
+        placement, blank = divmod(state, cells)
+        occupied = {}
+        rest = placement
+        for i in range(k):
+            rest, position = divmod(rest, cells)
+            occupied[position] = i
+        for position in adjacent[blank]:
+            i = occupied.get(position)
+            if i is None:
+                neighbor = placement * cells + position
+                if distances[neighbor] > distance:
+                    distances[neighbor] = distance
+                    queue.appendleft(neighbor)  # free move, keep it in the current layer
+            else:
+                neighbor = (placement + (blank - position) * powers[i]) * cells + position
+                if distances[neighbor] > distance + 1:
+                    distances[neighbor] = distance + 1
+                    queue.append(neighbor)
+    table = bytearray(size)
+    for placement in range(size):
+        table[placement] = min(distances[placement * cells : (placement + 1) * cells])
+    return table
+
+
+class PatternDatabase(object):
+    """
+    A set of disjoint additive pattern databases for boards of size n
+    n:        size of the board
+    patterns: tuple of disjoint groups of tiles
+    tables:   one byte per placement of each pattern (bytearray or memoryview)
+    """
+
+    def __init__(self, n: int, patterns, tables):
+        self.n = n
+        self.patterns = tuple(tuple(pattern) for pattern in patterns)
+        self.tables = tables
+        cells = n * n
+        self.powers = [
+            [cells**i for i in range(len(pattern))] for pattern in self.patterns
+        ]
+
+    @classmethod
+    def build(cls, n: int, patterns=None) -> "PatternDatabase":
+        """Build the databases of every pattern (it may take some minutes for 4x4)"""
+        if patterns is None:
+            if n not in DEFAULT_PATTERNS:
+                raise ValueError(
+                    f"there are no default patterns for {n}x{n} boards, "
+                    f"give the patterns (default sizes: {sorted(DEFAULT_PATTERNS)})"
+                )
+            patterns = DEFAULT_PATTERNS[n]
+        tiles = sorted(tile for pattern in patterns for tile in pattern)
+        if len(tiles) != len(set(tiles)) or not set(tiles) <= set(range(1, n * n)):
+            raise ValueError("patterns must be disjoint groups of tiles of the board")
+        return cls(n, patterns, [build_pattern(n, pattern) for pattern in patterns])
+
+    def save(self, path):
+        """
+        Save the databases in a binary file:
+        magic (4 bytes), version, n, number of patterns
+        for each pattern: number of tiles, the tiles (one byte each)
+        the tables, one after the other, aligned to 8 bytes
+        It is written to a temporary file of the same folder and renamed, so a
+        crash never leaves a partial database behind
+        """
+        header = bytearray(_MAGIC)
+        header += struct.pack("<BBB", _VERSION, self.n, len(self.patterns))
+        for pattern in self.patterns:
+            header += struct.pack("<B", len(pattern)) + bytes(pattern)
+        header += bytes(-len(header) % 8)
+        path = Path(path)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temporary, "wb") as f:
+                f.write(header)
+                for table in self.tables:
+                    f.write(table)
+            os.replace(temporary, path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path) -> "PatternDatabase":
+        """Memory map a file written by save, the tables are not copied"""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < 8 or data[:4] != _MAGIC or data[4] != _VERSION:
+            raise ValueError(f"{path} is not a pattern database file")
+        n, count = data[5], data[6]
+        offset = 7
+        patterns = []
+        for _ in range(count):
+            if offset >= len(data):
+                raise ValueError(f"{path} is truncated or corrupted")
+            k = data[offset]
+            patterns.append(tuple(data[offset + 1 : offset + 1 + k]))
+            offset += 1 + k
+        offset += -offset % 8
+        view = memoryview(data)
+        tables = []
+        for pattern in patterns:
+            size = (n * n) ** len(pattern)
+            tables.append(view[offset : offset + size])
+            offset += size
+        if offset != len(data):
+            raise ValueError(f"{path} is truncated or corrupted")
+        return cls(n, patterns, tables)
+
+    def distance(self, board) -> int:
+        """Sum of the number of moves of every pattern for the given board"""
+        positions = [0] * (self.n * self.n)
+        for idx, tile in enumerate(board.linear_board):
+            positions[tile] = idx
+        total = 0
+        for pattern, powers, table in zip(self.patterns, self.powers, self.tables):
+            placement = 0
+            for tile, power in zip(pattern, powers):
+                placement += positions[tile] * power
+            total += table[placement]
+        return total
+
+
+_databases: dict[int, PatternDatabase] = {}
+
+
+def default_path(n: int) -> Path:
+    return Path(__file__).parent / "source_data" / f"patterns{n}x{n}.pdb"
+
+
+def for_size(n: int) -> PatternDatabase:
+    """
+    Pattern database used by the solver for boards of size n. It is loaded from
+    its default file, or built and saved there the first time it is required.
+    A file that can't be loaded (e.g. empty or cut) is built again, and when the
+    folder is read only the databases are kept in memory only
+    """
+    database = _databases.get(n)
+    if database is None:
+        path = default_path(n)
+        if path.exists():
+            try:
+                database = PatternDatabase.load(path)
+            except (OSError, ValueError):
+                database = None  # rebuilt and saved again below
+        if database is None:
+            database = PatternDatabase.build(n)
+            try:
+                database.save(path)
+            except OSError:
+                pass  # e.g. a read only folder, the next process builds it again
+        _databases[n] = database
+    return database
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1])
+    patterns = [tuple(int(tile) for tile in arg.split(",")) for arg in sys.argv[2:]]
+    database = PatternDatabase.build(n, patterns or None)
+    database.save(default_path(n))
+    print("pattern database saved in " + str(default_path(n)))
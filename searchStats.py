@@ -0,0 +1,69 @@
+import time
+
+# *****************************************************************************
+#  Execution:    none
+#  Dependencies: none
+#
+#  Statistics of a search of the solver. The counters are always collected
+#  (they are only additions), the time spent in each part of the search is
+#  measured only when the solver is created with timing=True because reading
+#  the clock on every operation slows down the search.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+
+class SearchStats(object):
+    """
+    expanded:       boards whose neighbors were explored
+    generated:      neighbors added to the open list (or visited by IDA*)
+    duplicates:     neighbors discarded because they were already reached with
+                    the same or less moves (or undo the last move in IDA*)
+    max_open:       largest size of the open list (the deepest path for IDA*)
+    layers:         number of boards expanded for each value of f
+    heuristic_time: seconds spent calculating heuristic distances  (timing only)
+    neighbors_time: seconds spent generating neighbors             (timing only)
+    queue_time:     seconds spent in the priority queue operations (timing only)
+    elapsed:        seconds spent by the whole search
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.max_open = 0
+        self.layers: dict[int, int] = {}
+        self.heuristic_time = 0.0
+        self.neighbors_time = 0.0
+        self.queue_time = 0.0
+        self.elapsed = 0.0
+
+    def timed(self, function, measure: str):
+        """Wrap a function to add the seconds of each call to the given measure"""
+
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                setattr(
+                    self, measure, getattr(self, measure) + time.perf_counter() - start
+                )
+
+        return wrapper
+
+    def as_dict(self) -> dict:
+        return {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "max_open": self.max_open,
+            "layers": dict(sorted(self.layers.items())),
+            "heuristic_time": self.heuristic_time,
+            "neighbors_time": self.neighbors_time,
+            "queue_time": self.queue_time,
+            "elapsed": self.elapsed,
+        }
+
+    def __str__(self) -> str:
+        return "\n".join(f"{name}: {value}" for name, value in self.as_dict().items())
@@ -0,0 +1,208 @@
+from heapq import heappop, heappush
+from math import inf
+
+# *****************************************************************************
+#  Execution:    none
+#  Dependencies: none
+#
+#  Simplified memory-bounded A* (SMA*) for the n-puzzle game.
+#
+#  The search keeps at most max_nodes nodes in memory. Like A* it always works on
+#  the node with the lowest f (the deepest one when there is a tie), but it
+#  generates its successors one at a time. When the memory is full the worst
+#  leaf (highest f, the shallowest one when there is a tie) is forgotten and its
+#  f value is kept by its parent, so the parent knows how good that branch was
+#  and it regenerates it only when it becomes the best option again.
+#
+#  When all the successors of a node were generated, the f value of the node is
+#  raised to the lowest f of its successors (the f values are backed up through
+#  the ancestors), which keeps the estimates of the forgotten branches tight.
+#
+#  A node at the maximum depth that fits in memory (max_nodes - 1 moves) that is
+#  not the goal gets f = inf because its path can't be extended. The solution is
+#  optimal whenever the optimal path fits in memory (it has less than max_nodes
+#  boards), otherwise no solution is returned instead of running out of memory.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+
+class _Node(object):
+    """
+    A board kept in memory by the search
+    slot:      position of the node in the successors of its parent
+    children:  successors in memory, by slot
+    forgotten: f values of the successors removed from memory, by slot
+    generated: number of successors generated at least once
+    total:     number of successors (None until the node is expanded)
+    """
+
+    __slots__ = (
+        "board",
+        "g",
+        "f",
+        "depth",
+        "parent",
+        "slot",
+        "children",
+        "forgotten",
+        "generated",
+        "total",
+        "in_open",
+        "version",
+    )
+
+    def __init__(self, board, g: int, f: float, parent, slot: int):
+        self.board = board
+        self.g = g
+        self.f = f
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.parent = parent
+        self.slot = slot
+        self.children: dict[int, _Node] = {}
+        self.forgotten: dict[int, float] = {}
+        self.generated = 0
+        self.total = None
+        self.in_open = False
+        self.version = 0
+
+    def successors(self) -> list:
+        """Neighbors of the board, without the board of the parent"""
+        if self.parent is None:
+            return list(self.board.neighbors())
+        return [
+            neighbor
+            for neighbor in self.board.neighbors()
+            if not neighbor == self.parent.board
+        ]
+
+    def complete(self) -> bool:
+        """True when every successor is in memory"""
+        return self.total is not None and len(self.children) == self.total
+
+
+class SMAStar(object):
+    """
+    Memory bounded search from a board, heuristic(board) gives the h value and
+    stats (a SearchStats) receives the counters of the search
+    """
+
+    def __init__(
+        self, board, heuristic, max_nodes: int, stats, on_expand=None, on_generate=None
+    ):
+        if max_nodes < 1:
+            raise ValueError("the memory bounded search needs at least one node")
+        self.heuristic = heuristic
+        self.max_nodes = max_nodes
+        self.stats = stats
+        self.on_expand = on_expand
+        self.on_generate = on_generate
+        self.best_heap: list = []  # (f, -depth, order, version, node) lowest f first
+        self.worst_heap: list = []  # (-f, depth, order, version, node) highest f first
+        self.order = 0
+        self.count = 1
+        self.root = _Node(board, 0, heuristic(board), None, -1)
+        self.__open(self.root)
+
+    def __open(self, node: _Node):
+        """Add the node to the open list (or refresh its position)"""
+        node.in_open = True
+        node.version += 1
+        self.order += 1
+        heappush(
+            self.best_heap, (node.f, -node.depth, self.order, node.version, node)
+        )
+        heappush(
+            self.worst_heap, (-node.f, node.depth, self.order, node.version, node)
+        )
+
+    def __best(self):
+        while len(self.best_heap) > 0:
+            f, _, _, version, node = self.best_heap[0]
+            if node.in_open and node.version == version:
+                return node
+            heappop(self.best_heap)
+        return None
+
+    def __worst_leaf(self):
+        """Leaf of the open list with the highest f (the shallowest on a tie)"""
+        while len(self.worst_heap) > 0:
+            _, _, _, version, node = heappop(self.worst_heap)
+            if (
+                node.in_open
+                and node.version == version
+                and len(node.children) == 0
+                and node.parent is not None
+            ):
+                return node
+        return None
+
+    def __backup(self, node: _Node):
+        """Raise the f values of the node and its ancestors to their best successor"""
+        while node is not None and node.generated == node.total:
+            f = min(
+                [child.f for child in node.children.values()]
+                + list(node.forgotten.values())
+            )
+            if f <= node.f:
+                break
+            node.f = f
+            if node.in_open:
+                self.__open(node)
+            node = node.parent
+
+    def __forget(self, leaf: _Node):
+        """Remove a leaf from memory, its parent keeps its f value"""
+        parent = leaf.parent
+        leaf.in_open = False
+        del parent.children[leaf.slot]
+        parent.forgotten[leaf.slot] = leaf.f
+        self.count -= 1
+        self.__open(parent)  # the parent has a successor to generate again
+
+    def search(self):
+        """Return the goal node, or None when no solution fits in memory"""
+        stats = self.stats
+        while True:
+            best = self.__best()
+            if best is None or best.f == inf:
+                return None
+            if best.board.is_goal():
+                return best
+            successors = best.successors()
+            best.total = len(successors)
+            if best.generated < best.total:
+                slot = best.generated
+                best.generated += 1
+                known = 0
+            else:
+                slot = min(best.forgotten, key=best.forgotten.get)
+                known = best.forgotten.pop(slot)
+            stats.expanded += 1
+            stats.layers[best.f] = stats.layers.get(best.f, 0) + 1
+            if self.on_expand is not None:
+                self.on_expand(best.board, best.g)
+
+            board = successors[slot]
+            g = best.g + 1
+            if board.is_goal():
+                f = g
+            elif best.depth + 1 >= self.max_nodes - 1:
+                f = inf  # the path can't be extended without running out of memory
+            else:
+                f = g + self.heuristic(board)
+            child = _Node(board, g, max(f, best.f, known), best, slot)
+            best.children[slot] = child
+            self.count += 1
+            stats.generated += 1
+            if self.on_generate is not None:
+                self.on_generate(board, g)
+
+            if best.complete():
+                best.in_open = False
+            self.__backup(best)
+            self.__open(child)
+            while self.count > self.max_nodes:
+                self.__forget(self.__worst_leaf())
+            if self.count > stats.max_open:
+                stats.max_open = self.count
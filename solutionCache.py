@@ -0,0 +1,153 @@
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+# *****************************************************************************
+#  Execution:    none
+#  Dependencies: none
+#
+#  On disk cache of solved boards (a SQLite table). The key of an entry is the
+#  size of the board and its tiles (one byte per tile) and the value is the
+#  optimal sequence of moves of the blank tile (U, D, L or R).
+#
+#  A board and its reflection across the main diagonal (with the tiles renamed
+#  to the tile that sits on the reflected goal position) need the same number
+#  of moves, the moves of one of them are the moves of the other with U and L
+#  (D and R) swapped. Only the smallest of the two keys is stored, so solving
+#  a board also answers its transposed board.
+#
+#  The cache holds at most max_entries boards, the least recently used boards
+#  are evicted first.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+_TRANSPOSED_MOVES = str.maketrans("UDLR", "LRUD")
+# the use counter is shared by every process using the file, the index on the
+# column makes the next value a lookup of the last entry
+_NEXT_USE = "(SELECT COALESCE(MAX(used), 0) + 1 FROM solutions)"
+
+
+def transposed(n: int, tiles: bytes) -> bytes:
+    """Tiles of the board reflected across the main diagonal"""
+    # the tile t sits in the goal at the position t - 1 = r * n + c, after the
+    # reflection that goal position is c * n + r, so t becomes c * n + r + 1
+    rename = [0] + [(t % n) * n + t // n + 1 for t in range(n * n - 1)]
+    return bytes(rename[tiles[j * n + i]] for i in range(n) for j in range(n))
+
+
+def canonical(n: int, tiles: bytes) -> tuple[bytes, bool]:
+    """Key stored for the board and whether it is the transposed board"""
+    reflected = transposed(n, tiles)
+    if reflected < tiles:
+        return reflected, True
+    return tiles, False
+
+
+def default_path() -> Path:
+    """Location of the cache used when no path is given"""
+    return Path(__file__).parent / "source_data" / "solutions.sqlite"
+
+
+class SolutionCache(object):
+    """
+    Cache of the moves that solve a board
+    path:        SQLite file (":memory:" keeps the cache in this process only)
+    max_entries: the least recently used boards are evicted beyond this size
+    """
+
+    def __init__(self, path=None, max_entries: int = 1_000_000):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = str(default_path() if path is None else path)
+        self.max_entries = max_entries
+        # autocommit, every statement is its own transaction and the write ahead
+        # log lets many batch workers read while one of them writes
+        self.connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            " n INTEGER NOT NULL,"
+            " tiles BLOB NOT NULL,"
+            " moves BLOB NOT NULL,"
+            " used INTEGER NOT NULL,"
+            " PRIMARY KEY (n, tiles)) WITHOUT ROWID"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)"
+        )
+        # counting the rows scans the whole table, so the size is counted once and
+        # then updated by this process (other processes are seen on reopening)
+        (self.size,) = self.connection.execute(
+            "SELECT COUNT(*) FROM solutions"
+        ).fetchone()
+        # a hit only reads the table, the use of the boards is written in groups
+        self.touched: dict[tuple[int, bytes], None] = {}
+        self.flush_every = 256
+
+    def get(self, board) -> Optional[str]:
+        """Moves that solve the board, None when the board is not in the cache"""
+        n = board.dimension()
+        tiles, reflected = canonical(n, bytes(board.linear_board))
+        row = self.connection.execute(
+            "SELECT moves FROM solutions WHERE n = ? AND tiles = ?", (n, tiles)
+        ).fetchone()
+        if row is None:
+            return None
+        self.touched.pop((n, tiles), None)
+        self.touched[(n, tiles)] = None  # keep the order of the uses
+        if len(self.touched) >= self.flush_every:
+            self.flush()
+        moves = row[0].decode("ascii")
+        return moves.translate(_TRANSPOSED_MOVES) if reflected else moves
+
+    def put(self, board, moves: str):
+        """Store the moves that solve the board"""
+        n = board.dimension()
+        tiles, reflected = canonical(n, bytes(board.linear_board))
+        if reflected:
+            moves = moves.translate(_TRANSPOSED_MOVES)
+        self.flush()
+        known = self.connection.execute(
+            "SELECT 1 FROM solutions WHERE n = ? AND tiles = ?", (n, tiles)
+        ).fetchone()
+        self.connection.execute(
+            "INSERT OR REPLACE INTO solutions (n, tiles, moves, used)"
+            " VALUES (?, ?, ?, " + _NEXT_USE + ")",
+            (n, tiles, moves.encode("ascii")),
+        )
+        if known is None:
+            self.size += 1
+        if self.size > self.max_entries:
+            self.connection.execute(
+                "DELETE FROM solutions WHERE (n, tiles) IN"
+                " (SELECT n, tiles FROM solutions ORDER BY used LIMIT ?)",
+                (self.size - self.max_entries,),
+            )
+            self.size = self.max_entries
+
+    def flush(self):
+        """Write the uses of the boards read since the last flush"""
+        if len(self.touched) == 0:
+            return
+        with self.connection:  # a single transaction for the whole group
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "UPDATE solutions SET used = " + _NEXT_USE + " WHERE n = ? AND tiles = ?",
+                self.touched,
+            )
+        self.touched.clear()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
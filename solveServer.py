@@ -0,0 +1,309 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from board import PackedBoard
+from loader import PuzzleFormatError, validate
+from solver import HeuristicDistance, SearchAborted, SearchAlgorithm, Solver
+
+# *****************************************************************************
+#  Execution:    python solveServer.py [--host HOST] [--port PORT] [options]
+#  Dependencies: board.py loader.py solver.py
+#
+#  Solver as a service. An asyncio server takes the boards from TCP clients
+#  (one JSON object per line) and solves them in a pool of worker processes, so
+#  a hard board only keeps one worker busy while the server goes on answering.
+#
+#  - every request has a time and a node budget (the server defaults or the
+#    ones of the request), the search checks them while it runs and stops with
+#    an error instead of holding its worker forever. The time counts from the
+#    arrival of the request, the time waiting for a free worker included.
+#  - identical boards requested while the first one is being solved wait for
+#    that solve (coalescing), they don't start a new one, as long as that solve
+#    has the same node budget and a timeout at least as long as theirs. Each
+#    request still answers "timeout" at its own deadline. When every request
+#    waiting for a solve is cancelled or timed out, the solve is cancelled too:
+#    the worker sees the cancel event at its next check.
+#  - {"stats": true} returns the number of solves running and waiting for a
+#    worker (queue depth) and the percentiles of the latency of the requests.
+#
+#  Request:   {"blocks": [[1, 2, 3], [4, 0, 6], [7, 5, 8]], "timeout": 5}
+#             optional "timeout" (seconds) and "node_budget" (expanded boards)
+#  Response:  {"moves": 2, "solution": "DR", "seconds": 0.001, "coalesced": false}
+#             or {"error": "timeout", ...} ({"moves": -1} for unsolvable boards)
+#
+#  Example:
+#  python solveServer.py --port 8765 --workers 4 --timeout 10
+#  echo '{"blocks": [[1, 2, 3], [4, 0, 6], [7, 5, 8]]}' | nc localhost 8765
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+LATENCY_WINDOW = 10_000  # latencies kept for the percentiles
+
+
+def _solve(blocks, heuristic, algorithm, deadline, node_budget, cancel) -> dict:
+    """Solve a board inside a worker process, deadline is a time.time() or None"""
+    start = time.perf_counter()
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.time()  # the time in the queue is already spent
+        if timeout <= 0:
+            return {"error": "timeout", "seconds": 0.0}
+    try:
+        solver = Solver(
+            PackedBoard(blocks),
+            heuristic,
+            algorithm,
+            timeout=timeout,
+            node_budget=node_budget,
+            cancelled=cancel.is_set,
+        )
+    except SearchAborted as e:
+        return {"error": e.reason, "seconds": time.perf_counter() - start}
+    except Exception as e:  # e.g. a heuristic that doesn't support the size
+        return {"error": str(e), "seconds": time.perf_counter() - start}
+    return {
+        "moves": solver.number_of_moves(),
+        "solution": solver.solution_moves(),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def percentile(ordered: list[float], q: float) -> Optional[float]:
+    """Value below which a fraction q of the sorted values lies (nearest rank)"""
+    if len(ordered) == 0:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Job(object):
+    """A solve in the pool, shared by every request of the same board"""
+
+    def __init__(self, future, cancel, timeout, node_budget):
+        self.future = future
+        self.cancel = cancel  # multiprocessing Event seen by the worker
+        self.timeout = timeout
+        self.node_budget = node_budget
+        self.waiters = 0
+
+    def covers(self, timeout, node_budget) -> bool:
+        """The solve has the budgets of a request, or a longer timeout"""
+        if node_budget != self.node_budget:
+            return False
+        if self.timeout is None:
+            return True
+        return timeout is not None and timeout <= self.timeout
+
+
+class SolveServer(object):
+    """
+    Solve boards from coroutines (solve) or TCP clients (serve)
+    workers:     worker processes (one per core by default)
+    timeout:     seconds of search per board unless the request asks for less
+    node_budget: boards expanded per board unless the request asks for less
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        heuristic: HeuristicDistance = HeuristicDistance.LINEAR_CONFLICT,
+        algorithm: SearchAlgorithm = SearchAlgorithm.ASTAR,
+        timeout: Optional[float] = 30.0,
+        node_budget: Optional[int] = None,
+    ):
+        if algorithm == SearchAlgorithm.HDASTAR:
+            raise ValueError("HDASTAR can't run inside the workers of the server")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        # the events are proxies of a manager process, so they can be sent to the
+        # workers of the pool
+        self.manager = multiprocessing.Manager()
+        self.heuristic = heuristic
+        self.algorithm = algorithm
+        self.timeout = timeout
+        self.node_budget = node_budget
+        self.jobs: dict[tuple, _Job] = {}  # latest solve in the pool by board
+        self.running: set[_Job] = set()  # every solve in the pool
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.requests = self.coalesced = self.errors = 0
+
+    async def solve(
+        self, blocks, timeout: Optional[float] = None, node_budget: Optional[int] = None
+    ) -> dict:
+        """
+        Solve a board (list of rows), the budgets can only lower the ones of the
+        server. A request for a board already being solved waits for that solve
+        when its budgets cover the ones of the request, and it still answers
+        "timeout" at its own deadline
+        """
+        start = time.perf_counter()
+        self.requests += 1
+        try:
+            blocks = validate(blocks)
+            for budget in (timeout, node_budget):
+                if budget is not None and (
+                    type(budget) not in (int, float) or budget <= 0
+                ):
+                    raise PuzzleFormatError("<request>", 1, "invalid budget")
+        except PuzzleFormatError as e:
+            self.errors += 1
+            return {"error": e.message}
+        timeout = _lowest(self.timeout, timeout)
+        node_budget = _lowest(self.node_budget, node_budget)
+        deadline = None if timeout is None else time.time() + timeout
+        key = tuple(tile for row in blocks for tile in row)
+        job = self.jobs.get(key)
+        coalesced = job is not None and job.covers(timeout, node_budget)
+        if coalesced:
+            self.coalesced += 1
+        else:
+            job = self.__submit(key, blocks, timeout, deadline, node_budget)
+        job.waiters += 1
+        try:
+            wait = None if deadline is None else deadline - time.time()
+            result = dict(await asyncio.wait_for(asyncio.shield(job.future), wait))
+        except asyncio.TimeoutError:
+            result = {"error": "timeout", "seconds": time.perf_counter() - start}
+        finally:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.future.done():
+                job.cancel.set()  # nobody waits for this solve any more
+        if "error" in result:
+            self.errors += 1
+        result["coalesced"] = coalesced
+        latency = time.perf_counter() - start
+        self.latencies.append(latency)
+        result["latency"] = latency
+        return result
+
+    def __submit(self, key, blocks, timeout, deadline, node_budget) -> _Job:
+        cancel = self.manager.Event()
+        future = asyncio.get_running_loop().run_in_executor(
+            self.pool,
+            _solve,
+            blocks,
+            self.heuristic,
+            self.algorithm,
+            deadline,
+            node_budget,
+            cancel,
+        )
+        job = self.jobs[key] = _Job(future, cancel, timeout, node_budget)
+        self.running.add(job)
+
+        def done(_):
+            self.running.discard(job)
+            if self.jobs.get(key) is job:
+                del self.jobs[key]
+
+        future.add_done_callback(done)
+        return job
+
+    def stats(self) -> dict:
+        """Queue depth and latency percentiles (seconds) of the last requests"""
+        ordered = sorted(self.latencies)
+        running = len(self.running)
+        return {
+            "running": min(running, self.workers),
+            "queue_depth": max(0, running - self.workers),
+            "waiting_requests": sum(job.waiters for job in self.running),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "p50": percentile(ordered, 0.50),
+            "p90": percentile(ordered, 0.90),
+            "p99": percentile(ordered, 0.99),
+        }
+
+    async def handle(self, reader, writer):
+        """Answer the requests of a client, one JSON object per line"""
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request must be a JSON object")
+                except ValueError as e:
+                    response = {"error": "invalid request: " + str(e)}
+                else:
+                    if request.get("stats"):
+                        response = self.stats()
+                    else:
+                        response = await self.solve(
+                            request.get("blocks"),
+                            request.get("timeout"),
+                            request.get("node_budget"),
+                        )
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass  # the client left
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for job in self.running:
+            job.cancel.set()
+        self.pool.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+
+def _lowest(limit, requested):
+    """The budget of a request, it can't go over the limit of the server"""
+    if requested is None:
+        return limit
+    if limit is None:
+        return requested
+    return min(limit, requested)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="n-puzzle solving server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--heuristic",
+        choices=[h.name for h in HeuristicDistance],
+        default=HeuristicDistance.LINEAR_CONFLICT.name,
+    )
+    parser.add_argument(
+        "--algorithm",
+        choices=[a.name for a in SearchAlgorithm if a != SearchAlgorithm.HDASTAR],
+        default=SearchAlgorithm.ASTAR.name,
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per board")
+    parser.add_argument("--node-budget", type=int, default=None)
+    args = parser.parse_args()
+
+    server = SolveServer(
+        args.workers,
+        HeuristicDistance[args.heuristic],
+        SearchAlgorithm[args.algorithm],
+        args.timeout,
+        args.node_budget,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
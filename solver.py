@@ -1,9 +1,26 @@
+import araStar
+import hdaStar
+import loader
 import minPQ
-from board import Board  # from the file import the class name
+import patternDatabase
+import smaStar
+import stateTable
+from board import Board, PackedBoard, move_name, move_target, standard_goal  # from the file import the class name
+from bucketPQ import BucketPQ
+from checkpoint import AStarCheckpoint, Counters, IDAStarCheckpoint, ROOT
+from checkpoint import load as load_checkpoint, move_index, move_of
+from indexMinPQ import IndexMinPQ
+from searchStats import SearchStats
+from solutionCache import SolutionCache
+import os
 import random
 from heapq import heappop, heappush
 from pathlib import Path
 from enum import Enum, auto
+from functools import partial
+from math import inf
+from time import perf_counter
+from typing import Callable, Optional
 
 # *****************************************************************************
 #  Execution:    python solver.py
@@ -79,6 +96,17 @@ from enum import Enum, auto
 ##############################################################################/z
 
 
+_FOUND = -1  # returned by the depth first search of IDA* when the goal is reached
+
+
+class SearchAborted(Exception):
+    """The search ran out of its time or node budget, or it was cancelled"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason  # "timeout", "node budget" or "cancelled"
+
+
 class BoardNode(object):
     """
     Recursive data structure, a wrapper for the class board to make a linked list
@@ -93,13 +121,152 @@ class BoardNode(object):
         self.link = link
 
 
+class _Frontier(object):
+    """
+    Open list of one of the searches of the bidirectional A*
+    nodes: best BoardNode found for each board key (state is its number of moves)
+    heap:  entries (priority, moves, order, key), an entry whose number of moves
+           is not the best one for its board is stale and skipped
+    """
+
+    def __init__(self, root: Board, heuristic):
+        self.heuristic = heuristic
+        self.nodes = {root.key(): BoardNode(root, 0, None)}
+        self.heap = [(heuristic(root), 0, 0, root.key())]
+        self.order = 1  # insertion order, breaks the ties of the heap
+
+    def priority(self):
+        """Lowest priority of the open list (inf when it is empty)"""
+        while len(self.heap) > 0:
+            priority, moves, _, key = self.heap[0]
+            if self.nodes[key].state == moves:
+                return priority
+            heappop(self.heap)
+        return inf
+
+    def pop(self) -> BoardNode:
+        """Remove the node with the lowest priority, call priority() first"""
+        return self.nodes[heappop(self.heap)[3]]
+
+    def push(self, board: Board, link: BoardNode):
+        """
+        Add a board reached from the node link, it returns the new node or None
+        when the board was already reached with the same or less moves
+        """
+        key = board.key()
+        moves = link.state + 1
+        known = self.nodes.get(key)
+        if known is not None and known.state <= moves:
+            return None
+        board_node = BoardNode(board, moves, link)
+        self.nodes[key] = board_node
+        priority = max(moves + self.heuristic(board), 2 * moves)
+        heappush(self.heap, (priority, moves, self.order, key))
+        self.order += 1
+        return board_node
+
+
+class _TargetDistance(object):
+    """Manhattan and Hamming distances from any board to a fixed target board"""
+
+    def __init__(self, target: Board):
+        n = target.dimension()
+        self.target = target.linear_board
+        position = [0] * (n * n)
+        for idx, tile in enumerate(self.target):
+            position[tile] = idx
+        self.distances = [
+            [
+                abs(idx // n - position[tile] // n) + abs(idx % n - position[tile] % n)
+                for idx in range(n * n)
+            ]
+            for tile in range(n * n)
+        ]
+        self.distances[0] = [0] * (n * n)  # the blank tile is not counted
+
+    def manhattan(self, board: Board) -> int:
+        distances = self.distances
+        return sum(distances[tile][idx] for idx, tile in enumerate(board.linear_board))
+
+    def hamming(self, board: Board) -> int:
+        target = self.target
+        return sum(
+            1
+            for idx, tile in enumerate(board.linear_board)
+            if tile != 0 and target[idx] != tile
+        )
+
+
 class HeuristicDistance(Enum):
     """
     Available heuristic distances to solve the 8-puzzle game
+    PATTERN_DATABASE uses the additive pattern databases of patternDatabase.py
+    (they are built the first time a board of a given size needs them)
+    LINEAR_CONFLICT is the Manhattan distance plus 2 moves per linear conflict
+    WALKING_DISTANCE uses the tables of walkingDistance.py (up to 4x4 boards)
     """
 
     MANHATTAN = auto()
     HAMMING = auto()
+    PATTERN_DATABASE = auto()
+    LINEAR_CONFLICT = auto()
+    WALKING_DISTANCE = auto()
+
+
+class QueueBackend(Enum):
+    """
+    Available min priority queues for the open list of the A* algorithm
+    HEAPQ:  the min heap queue provided by the heapq library
+    MINPQ:  the binary heap of minPQ.py
+    BUCKET: the bucket queue of bucketPQ.py, O(1) insert and delMin for the small
+            integer f costs of the game
+    INDEXED: the indexed heap of indexMinPQ.py, each board is in the open list
+             at most once and a shorter path lowers its key in place
+    """
+
+    HEAPQ = auto()
+    MINPQ = auto()
+    BUCKET = auto()
+    INDEXED = auto()
+
+
+class SearchAlgorithm(Enum):
+    """
+    Available search engines to explore the game tree
+    ASTAR:         A* with a min priority queue, it keeps every generated node in memory
+    IDASTAR:       iterative deepening A*, a depth first search bounded by f whose
+                   memory is proportional to the depth of the solution
+    BIDIRECTIONAL: two A* searches, from the initial board and from the goal board,
+                   that meet in the middle (MM algorithm)
+    SMASTAR:       memory bounded A* (see smaStar.py), it never keeps more than
+                   max_nodes nodes in memory
+    HDASTAR:       hash distributed A* (see hdaStar.py), the boards are split among
+                   worker processes (one per core unless workers is given)
+    ARASTAR:       anytime weighted A* (see araStar.py), a first solution found with
+                   a high weight is improved while the time budget lasts
+    """
+
+    ASTAR = auto()
+    IDASTAR = auto()
+    BIDIRECTIONAL = auto()
+    SMASTAR = auto()
+    HDASTAR = auto()
+    ARASTAR = auto()
+
+
+def heuristic_distance(board: Board, heuristic: HeuristicDistance) -> int:
+    """Value of the selected heuristic distance for a board"""
+    match heuristic:
+        case heuristic.MANHATTAN:
+            return board.manhattan()
+        case heuristic.HAMMING:
+            return board.hamming()
+        case heuristic.PATTERN_DATABASE:
+            return patternDatabase.for_size(board.dimension()).distance(board)
+        case heuristic.LINEAR_CONFLICT:
+            return board.linear_conflict()
+        case heuristic.WALKING_DISTANCE:
+            return board.walking_distance()
 
 
 class Solver(object):
@@ -113,15 +280,250 @@ class Solver(object):
 
     where g are the number of moves and h is either the Manhattan or
     Hamming distances
+
+    The statistics of the search are kept in self.stats (see searchStats.py).
+    To watch the search while it runs register the hooks on_expand, on_generate
+    and on_goal, they are called with the board and its number of moves (the
+    board given to IDA* hooks is modified later, copy it if you need to keep it).
+    The boards of HDASTAR are expanded in other processes, so only on_goal is
+    called for it
+
+    With a SolutionCache (see solutionCache.py) the boards already solved are
+    answered from the cache without searching. The boards up to 3x3 are answered
+    from the complete tables of stateTable.py unless state_tables is False (e.g.
+    to measure the search engines). self.cached tells which boards were answered
+    without searching
+
+    goal is the target board (e.g. board.spiral_goal(n)), by default the goal of
+    the given board (the tiles in order and the blank last unless it was created
+    with another goal)
+
+    When a good solution now is better than the best one later:
+    - weight > 1 makes ASTAR a weighted A* (f = g + weight * h), the solution has at
+      most weight times the minimum number of moves. weight = inf is a greedy
+      best first search (f = h) without any bound
+    - ARASTAR starts with weight (3 by default) and lowers it by 0.5 after each
+      solution until the solution is optimal or time_budget seconds have passed.
+      on_solution is called with the number of moves and the bound of each
+      improved solution, the solver keeps the last one
+    bound() is the guaranteed ratio between number_of_moves() and the minimum
+    number of moves (1 for an optimal solution), only optimal solutions are
+    stored in the cache
+
+    A search can be stopped from inside: after timeout seconds, after expanding
+    node_budget boards, or when cancelled() returns True (it is asked every 256
+    expanded boards, so it may be a slow call like a multiprocessing Event). The
+    constructor then raises SearchAborted. HDASTAR doesn't support these limits
+
+    A long ASTAR or IDASTAR search can save its state every checkpoint_every
+    seconds to the file checkpoint (see checkpoint.py). After a crash, or after
+    SearchAborted, Solver.from_checkpoint (or resume=True with the same board)
+    goes on from the last save instead of starting again. The file is removed
+    when the search ends
     """
 
-    def __init__(self, boardGame: Board, heuristic: HeuristicDistance):
+    def __init__(
+        self,
+        boardGame: Board,
+        heuristic: HeuristicDistance,
+        algorithm: SearchAlgorithm = SearchAlgorithm.ASTAR,
+        queue: QueueBackend = QueueBackend.HEAPQ,
+        on_expand: Optional[Callable[[Board, int], None]] = None,
+        on_generate: Optional[Callable[[Board, int], None]] = None,
+        on_goal: Optional[Callable[[Board, int], None]] = None,
+        timing: bool = False,
+        max_nodes: Optional[int] = None,
+        cache: Optional[SolutionCache] = None,
+        goal: Optional[list[list[int]]] = None,
+        workers: Optional[int] = None,
+        state_tables: bool = True,
+        weight: Optional[float] = None,
+        time_budget: Optional[float] = None,
+        on_solution: Optional[Callable[[int, float], None]] = None,
+        timeout: Optional[float] = None,
+        node_budget: Optional[int] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+        checkpoint: Optional[str] = None,
+        checkpoint_every: float = 60.0,
+        resume: bool = False,
+    ):
+        if goal is not None:
+            boardGame = type(boardGame)(boardGame.blocks(), goal)
         self.board = boardGame
+        standard = boardGame.goal_blocks() == standard_goal(boardGame.dimension())
+        if not standard and heuristic == HeuristicDistance.PATTERN_DATABASE:
+            raise ValueError("the pattern databases are built for the standard goal")
+        if not standard and cache is not None:
+            raise ValueError("the solution cache only holds boards of the standard goal")
         self.heuristic = heuristic
+        self.algorithm = algorithm
+        self.queue = queue
+        self.on_expand = on_expand
+        self.on_generate = on_generate
+        self.on_goal = on_goal
+        self.timing = timing  # measure the time spent in each part of the search
+        self.max_nodes = max_nodes  # memory budget of SMASTAR
+        self.workers = workers  # worker processes of HDASTAR
+        if weight is None:
+            weight = 3.0 if algorithm == SearchAlgorithm.ARASTAR else 1.0
+        if weight < 1:
+            raise ValueError("the weight must be at least 1")
+        if weight != 1 and algorithm not in (
+            SearchAlgorithm.ASTAR,
+            SearchAlgorithm.ARASTAR,
+        ):
+            raise ValueError("only ASTAR and ARASTAR accept a weight")
+        self.weight = weight
+        self.time_budget = time_budget  # seconds to improve the solution of ARASTAR
+        self.on_solution = on_solution
+        self.suboptimality = 1.0  # bound of the ratio to the minimum number of moves
+        self.stats = SearchStats()
+        self.timeout = timeout
+        self.node_budget = node_budget
+        self.cancelled = cancelled
+        if timeout is not None or node_budget is not None or cancelled is not None:
+            if algorithm == SearchAlgorithm.HDASTAR:
+                raise ValueError("HDASTAR can't be stopped by a budget")
+            # every engine calls on_expand for each board it expands, so that is
+            # where the search checks its budget
+            self.on_expand = self.__budgeted(on_expand)
+        if checkpoint is not None and algorithm not in (
+            SearchAlgorithm.ASTAR,
+            SearchAlgorithm.IDASTAR,
+        ):
+            raise ValueError("only ASTAR and IDASTAR searches can be checkpointed")
+        if resume and checkpoint is None:
+            raise ValueError("resume needs the checkpoint file")
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every  # seconds between two saves
+        self.__saved = self.__load_checkpoint(algorithm) if resume else None
         self.moves = 0  # counter to count the moves required to reach the solution
-        self.solutions: list[Board] = []
-        self.__solve()  # remember the _ and __ expresses my intent of declare this
-        # variables as private
+        self.path = b""  # the solution as one byte (U, D, L or R) per blank move
+        self.cached = False  # the solution was read from the cache or the tables
+        # the parity of the board tells us in O(n log n) if the goal can be reached,
+        # an unsolvable board is rejected without exploring the game tree at all
+        self.solvable = self.board.is_solvable()
+        if not self.solvable:
+            self.moves = -1
+            return
+        start = perf_counter()
+        moves = None if cache is None else cache.get(self.board)
+        n = self.board.dimension()
+        if moves is None and state_tables and standard and n <= stateTable.MAX_SIZE:
+            moves = stateTable.for_size(n).solve(self.board)
+        if moves is not None:
+            self.cached = True
+            self.moves = len(moves)
+            self.path = moves.encode("ascii")
+        else:
+            match algorithm:
+                case SearchAlgorithm.ASTAR:
+                    self.__solve()  # remember the _ and __ expresses my intent of
+                    # declare this variables as private
+                case SearchAlgorithm.IDASTAR:
+                    self.__ida_solve()
+                case SearchAlgorithm.BIDIRECTIONAL:
+                    self.__bidirectional_solve()
+                case SearchAlgorithm.SMASTAR:
+                    self.__sma_solve()
+                case SearchAlgorithm.HDASTAR:
+                    self.__hda_solve()
+                case SearchAlgorithm.ARASTAR:
+                    self.__ara_solve()
+            if checkpoint is not None and os.path.exists(checkpoint):
+                os.remove(checkpoint)  # the search is over, nothing to resume
+        self.stats.elapsed = perf_counter() - start
+        if (
+            cache is not None
+            and not self.cached
+            and self.moves >= 0
+            and self.suboptimality == 1
+        ):
+            cache.put(self.board, self.solution_moves())
+        if self.on_goal is not None and self.moves >= 0:
+            for goal in self:
+                pass  # the last board of the solution is the goal
+            self.on_goal(goal, self.moves)
+
+    @classmethod
+    def from_checkpoint(
+        cls, path: str, heuristic: HeuristicDistance, **options
+    ) -> "Solver":
+        """Go on with the search saved in a checkpoint file, options as in Solver"""
+        saved = load_checkpoint(path, records=False)
+        n = saved.n
+
+        def rows(tiles):
+            return [tiles[i * n : (i + 1) * n] for i in range(n)]
+
+        board = (PackedBoard if saved.packed else Board)(
+            rows(saved.initial), rows(saved.goal)
+        )
+        if isinstance(saved, AStarCheckpoint):
+            algorithm = SearchAlgorithm.ASTAR
+        else:
+            algorithm = SearchAlgorithm.IDASTAR
+        return cls(
+            board, heuristic, algorithm, checkpoint=path, resume=True, **options
+        )
+
+    def __load_checkpoint(self, algorithm: SearchAlgorithm):
+        """State saved by an earlier search of the same board"""
+        saved = load_checkpoint(self.checkpoint)
+        if algorithm == SearchAlgorithm.ASTAR:
+            expected = AStarCheckpoint
+        else:
+            expected = IDAStarCheckpoint
+        goal = [tile for row in self.board.goal_blocks() for tile in row]
+        if (
+            type(saved) is not expected
+            or saved.initial != list(self.board.linear_board)
+            or saved.goal != goal
+        ):
+            raise ValueError(
+                f"{self.checkpoint} is not the {algorithm.name} search of this board"
+            )
+        stats = self.stats
+        (
+            stats.expanded,
+            stats.generated,
+            stats.duplicates,
+            stats.max_open,
+        ) = saved.counters
+        return saved
+
+    def __header(self) -> tuple:
+        """Fields shared by both kinds of checkpoint"""
+        stats = self.stats
+        return (
+            self.board.dimension(),
+            [tile for row in self.board.goal_blocks() for tile in row],
+            isinstance(self.board, PackedBoard),
+            list(self.board.linear_board),
+            Counters(
+                stats.expanded, stats.generated, stats.duplicates, stats.max_open
+            ),
+        )
+
+    def __budgeted(self, on_expand):
+        """on_expand hook that raises SearchAborted when the budget runs out"""
+        deadline = inf if self.timeout is None else perf_counter() + self.timeout
+        node_budget = inf if self.node_budget is None else self.node_budget
+        cancelled = self.cancelled
+        stats = self.stats
+
+        def check(board, moves):
+            if stats.expanded > node_budget:
+                raise SearchAborted("node budget")
+            if stats.expanded & 255 == 0:
+                if perf_counter() > deadline:
+                    raise SearchAborted("timeout")
+                if cancelled is not None and cancelled():
+                    raise SearchAborted("cancelled")
+            if on_expand is not None:
+                on_expand(board, moves)
+
+        return check
 
     def __solve(self):
         state = 0
@@ -129,88 +531,511 @@ class Solver(object):
             self.board, state, None
         )  # Create a node board (basically it's a linked list)
         seeker_node = self.aStar(
-            board_node, self.heuristic
+            board_node, self.heuristic, self.weight
         )  # I wrapped immediately the initial board node
         # with the aStar class and its methods to perform calculations
 
-        # Uncomment if you want to use my code for the min probity queue intend of the one
-        # provided by the heapq library
-        # pq = minPQ.MinPQ()             # you can use this minPQ instead and compare which is faster
-        # pq.insert(seeker_node)
+        # The open list can be my code for the min priority queue (minPQ.py), the min
+        # heap queue provided by the heapq library or the bucket queue (bucketPQ.py),
+        # choose it with the queue argument of the solver and compare which is faster
+        match self.queue:
+            case QueueBackend.HEAPQ:
+                pq = []  # the heapq library requires an empty list to build the heap
+
+                def push(node):
+                    heappush(pq, node)
+
+                def pop():
+                    return heappop(pq)
+
+                def size():
+                    return len(pq)
+
+                def frontier():
+                    return pq
+
+            case QueueBackend.MINPQ:
+                pq = minPQ.MinPQ()
+                push, pop, size = pq.insert, pq.delMin, pq.size
+
+                def frontier():
+                    return pq.pq[1 : pq.N + 1]
 
-        # Uncomment the two lines below to implement min heap queue provided by the heapq library
+            case QueueBackend.BUCKET:
+                pq = BucketPQ()
 
-        pq = []  # the heapq library requires an empty list to build the heap
-        heappush(
-            pq, seeker_node
-        )  # and push the first element into this empty list using heappush
-        i = 0
-        while True:  # the seeker node is a search node with the A* methods
-            # seeker_node = pq.delMin()   # uncomment if you are using the minPQ.py file
+                def push(node):
+                    pq.insert(node, node.cost_function, node.heuristic_distance)
+
+                pop, size = pq.delMin, pq.size
+
+                def frontier():
+                    return [
+                        node for bucket in pq.buckets for ties in bucket for node in ties
+                    ]
+            case QueueBackend.INDEXED:
+                pq = IndexMinPQ()
+                handles: dict = {}  # board key: handle of the board in the queue
+                branches: list = []  # handle: best seeker node of the board
+
+                def push(node):
+                    # the key orders by f and breaks the ties with h like __lt__
+                    key = node.cost_function << 16 | node.heuristic_distance
+                    board_key = node.get_Board_Node().current.key()
+                    handle = handles.get(board_key)
+                    if handle is None:
+                        handles[board_key] = len(branches)
+                        pq.insert(len(branches), key)
+                        branches.append(node)
+                    else:
+                        # only a board still in the open list can improve its g
+                        branches[handle] = node
+                        pq.decreaseKey(handle, key)
+
+                def pop():
+                    return branches[pq.delMin()]
+
+                size = pq.size
+
+                def frontier():
+                    return [node for i, node in enumerate(branches) if pq.contains(i)]
+
+        stats = self.stats
+        layers = stats.layers
+        on_expand, on_generate = self.on_expand, self.on_generate
+        make_branch = partial(self.aStar, weight=self.weight)
+
+        def neighbors_of(board):
+            return board.neighbors()
+
+        if self.timing:
+            push = stats.timed(push, "queue_time")
+            pop = stats.timed(pop, "queue_time")
+            make_branch = stats.timed(make_branch, "heuristic_time")
+            neighbors_of = stats.timed(
+                lambda board: list(board.neighbors()), "neighbors_time"
+            )
+
+        # The closed set keeps the compact key of every board already expanded, so a
+        # configuration reached again through a longer cycle is never expanded twice
+        # (with its node, a checkpoint saves the move that reached each board).
+        # best_g records the lowest number of moves found so far for each board seen,
+        # a heap entry that was superseded by a cheaper path is skipped when popped
+        closed: dict = {}
+        best_g: dict = {self.board.key(): state}
+        if self.__saved is None:
+            push(seeker_node)  # and push the first element into the empty open list
+        else:
+            for board_node, expanded in self.__restore(self.__saved):
+                key = board_node.current.key()
+                best_g[key] = board_node.state
+                if expanded:
+                    closed[key] = board_node
+                else:
+                    push(self.aStar(board_node, self.heuristic, self.weight))
+            self.__saved = None
+        checkpoint_file = self.checkpoint
+        next_save = perf_counter() + self.checkpoint_every
+        goal_node = None
+        while size() > 0:  # the seeker node is a search node with the A* methods
             # get the board node processed by the A* algorithm
-            seeker_node = heappop(pq)  # uncomment if you are using the heapq library
+            seeker_node = pop()
             board_node = (
                 seeker_node.get_Board_Node()
             )  # get the board node with the lowest scoring function value
+            key = board_node.current.key()
+            if key in closed or best_g[key] < board_node.state:
+                continue  # stale entry, this board was already reached with fewer moves
+            if board_node.current.is_goal():
+                goal_node = board_node
+                break
+            closed[key] = board_node
+            stats.expanded += 1
+            f = seeker_node.get_priority()
+            layers[f] = layers.get(f, 0) + 1
+            if (
+                checkpoint_file is not None
+                and stats.expanded & 1023 == 0
+                and perf_counter() >= next_save
+            ):
+                self.__save_astar(closed, frontier(), best_g)
+                next_save = perf_counter() + self.checkpoint_every
+            if on_expand is not None:  # for debugging register an on_expand hook
+                on_expand(board_node.current, board_node.state)
             old_board_node = board_node  # We keep the previous move because inside this node there are
             state = (
                 old_board_node.state + 1
             )  # an internal counter that help us to keep track the number
             # of moves for a particular node
-            if board_node.link == None:
-                predecessor = None  # if there isn't any link to another node, this node doesn't have a predecessor
-            else:
-                predecessor = (
-                    board_node.link.current
-                )  # else we set the current node as the predecessor for the next
-            # Uncomment for debbuging
-            # print("Step: " + str(i))
-            # print("Priority " + str(seeker_node.get_priority()))
-            # print("moves: " + str(board_node.state))
-            # print("manhattan " + str(board_node.current.manhattan()))
-            # print("search node: ")
-            # print(board_node.current)
-            # print('----------')
-            # print("neighbors")
 
             # Game tree loop. We iterate through the neighbors
-            for neighbor in board_node.current.neighbors():
-                if not (
-                    neighbor == predecessor
-                ):  # to avoid repetitions the current neighbor must be different to the previous configuration
-                    # print(neighbor)
-                    board_node = BoardNode(neighbor, state, old_board_node)
-                    branch = self.aStar(board_node, self.heuristic)
-                    # pq.insert(branch)
-                    heappush(pq, branch)
-            i += 1
-            if old_board_node.current.is_goal():
-                break
-        # uncomment to know how many iteretions were required to find the solution
-        # print("iterations " + str(i))
+            for neighbor in neighbors_of(old_board_node.current):
+                neighbor_key = neighbor.key()
+                # to avoid repetitions the neighbor must not be expanded yet and must
+                # improve the number of moves of any previous path that reached it
+                if neighbor_key in closed or best_g.get(neighbor_key, state + 1) <= state:
+                    stats.duplicates += 1
+                    continue
+                best_g[neighbor_key] = state
+                board_node = BoardNode(neighbor, state, old_board_node)
+                branch = make_branch(board_node, self.heuristic)
+                push(branch)
+                stats.generated += 1
+                if on_generate is not None:
+                    on_generate(neighbor, state)
+            if size() > stats.max_open:
+                stats.max_open = size()
 
+        if goal_node is None:
+            self.moves = -1  # the search space was exhausted without reaching the goal
+            return
+        self.suboptimality = self.weight
+        self.__record(goal_node)
+
+    def __save_astar(self, closed: dict, frontier, best_g: dict):
+        """Save the expanded boards and the open list of __solve"""
+        n = self.board.dimension()
+        records = []
+
+        def add(board_node: BoardNode, expanded: bool):
+            tiles = list(board_node.current.linear_board)
+            move = ROOT
+            if board_node.link is not None:
+                Idx = board_node.link.current.linear_board.index(0)
+                move = move_index(move_name(n, Idx, tiles.index(0)))
+            records.append((tiles, board_node.state, move, expanded))
+
+        for board_node in closed.values():
+            add(board_node, True)
+        for seeker_node in frontier:
+            board_node = seeker_node.get_Board_Node()
+            key = board_node.current.key()
+            if key not in closed and best_g[key] == board_node.state:
+                add(board_node, False)  # the stale entries are left out
+        AStarCheckpoint(*self.__header(), records).save(self.checkpoint)
+
+    def __restore(self, saved: AStarCheckpoint):
+        """BoardNode chains of a checkpoint, each one with its closed flag"""
+        n = saved.n
+        goal = self.board.goal_blocks()
+        nodes: dict = {}  # tiles: BoardNode
+        restored = []
+        # a parent has one move less than its child, so it is always rebuilt first
+        for tiles, g, move, expanded in sorted(saved.records, key=lambda r: r[1]):
+            if move == ROOT:
+                board_node = BoardNode(self.board, 0, None)
+            else:
+                # undo the move: the blank tile goes back the opposite way
+                blank = tiles.index(0)
+                Idx = move_target(n, blank, move_of(move ^ 1))
+                parent = list(tiles)
+                parent[blank], parent[Idx] = parent[Idx], 0
+                board = type(self.board)(
+                    [tiles[i * n : (i + 1) * n] for i in range(n)], goal
+                )
+                board_node = BoardNode(board, g, nodes[tuple(parent)])
+            nodes[tuple(tiles)] = board_node
+            restored.append((board_node, expanded))
+        return restored
+
+    def __record(self, goal_node: BoardNode):
         # Once we found the goal board we used its link to retrieve all the previous
-        # steps and we store them in a list
-        self.moves = state  # update the number of moves
-        board_node = board_node.link
+        # positions of the blank tile, only the moves between them are stored
+        self.moves = goal_node.state  # update the number of moves
+        blanks: list[int] = []
+        board_node = goal_node
         while board_node != None:
-            self.solutions.append(board_node.current)
+            blanks.append(board_node.current.linear_board.index(0))
             board_node = board_node.link
+        self.__encode(blanks[::-1])
+
+    def __encode(self, blanks: list[int]):
+        """Store the moves between consecutive positions of the blank tile"""
+        n = self.board.dimension()
+        self.path = "".join(
+            move_name(n, Idx, nIdx) for Idx, nIdx in zip(blanks, blanks[1:])
+        ).encode("ascii")
+
+    def __bidirectional_solve(self):
+        """
+        Bidirectional A* with the MM algorithm. The forward search goes from the
+        initial board to the goal and the backward search from the goal board to
+        the initial board. Each search expands the node with the lowest priority
+        pr = max(f, 2g), which guarantees that neither of them goes further than
+        the middle of the optimal solution. Every time a board is reached by both
+        searches we have a candidate solution, and the search stops when the best
+        candidate is not greater than the lowest priority of both open lists,
+        because no other solution can be shorter.
+
+        The backward search estimates the distance to the initial board with the
+        Manhattan distance (or the Hamming distance when it is the selected one)
+        """
+        goal = type(self.board)(self.board.goal_blocks(), self.board.goal_blocks())
+        target = _TargetDistance(self.board)
+        if self.heuristic == HeuristicDistance.HAMMING:
+            backward_heuristic = target.hamming
+        else:
+            backward_heuristic = target.manhattan
+        forward_heuristic = lambda board: heuristic_distance(board, self.heuristic)
+        stats = self.stats
+        if self.timing:
+            forward_heuristic = stats.timed(forward_heuristic, "heuristic_time")
+            backward_heuristic = stats.timed(backward_heuristic, "heuristic_time")
+        forward = _Frontier(self.board, forward_heuristic)
+        backward = _Frontier(goal, backward_heuristic)
+
+        def neighbors_of(board):
+            return board.neighbors()
+
+        if self.timing:
+            neighbors_of = stats.timed(
+                lambda board: list(board.neighbors()), "neighbors_time"
+            )
+        best, meeting = inf, None
+        if self.board.key() in backward.nodes:
+            best, meeting = 0, self.board.key()  # the initial board is the goal
+        while True:
+            forward_priority = forward.priority()
+            backward_priority = backward.priority()
+            if best <= min(forward_priority, backward_priority):
+                break  # no path through the open lists can beat the best solution
+            if forward_priority <= backward_priority:
+                frontier, other = forward, backward
+            else:
+                frontier, other = backward, forward
+            board_node = frontier.pop()
+            stats.expanded += 1
+            priority = min(forward_priority, backward_priority)
+            stats.layers[priority] = stats.layers.get(priority, 0) + 1
+            if self.on_expand is not None:
+                self.on_expand(board_node.current, board_node.state)
+            for neighbor in neighbors_of(board_node.current):
+                child = frontier.push(neighbor, board_node)
+                if child is None:
+                    stats.duplicates += 1
+                    continue
+                stats.generated += 1
+                if self.on_generate is not None:
+                    self.on_generate(neighbor, child.state)
+                key = neighbor.key()
+                if key in other.nodes and child.state + other.nodes[key].state < best:
+                    best, meeting = child.state + other.nodes[key].state, key
+            if len(forward.heap) + len(backward.heap) > stats.max_open:
+                stats.max_open = len(forward.heap) + len(backward.heap)
+
+        # the forward chain already links the meeting board with the initial board,
+        # the boards of the backward chain are linked after it up to the goal board
+        board_node = forward.nodes[meeting]
+        backward_node = backward.nodes[meeting].link
+        while backward_node != None:
+            board_node = BoardNode(
+                backward_node.current, board_node.state + 1, board_node
+            )
+            backward_node = backward_node.link
+        self.__record(board_node)
+
+    def __sma_solve(self):
+        """
+        Memory bounded A*, when the budget of nodes is reached the worst leaves are
+        forgotten. If not even the optimal path fits in the budget number_of_moves()
+        is -1 although the board is solvable
+        """
+        if self.max_nodes is None:
+            raise ValueError("SMASTAR needs a budget of nodes (max_nodes)")
+        search = smaStar.SMAStar(
+            self.board,
+            lambda board: heuristic_distance(board, self.heuristic),
+            self.max_nodes,
+            self.stats,
+            self.on_expand,
+            self.on_generate,
+        )
+        node = search.search()
+        if node is None:
+            self.moves = -1
+            return
+        path = []
+        while node is not None:
+            path.append(node.board)
+            node = node.parent
+        board_node = None
+        for moves, board in enumerate(reversed(path)):
+            board_node = BoardNode(board, moves, board_node)
+        self.__record(board_node)
+
+    def __hda_solve(self):
+        """
+        Hash distributed A*, the heuristic is sent to the worker processes so it
+        is a partial of heuristic_distance instead of a lambda
+        """
+        search = hdaStar.HDAStar(
+            self.board,
+            partial(heuristic_distance, heuristic=self.heuristic),
+            self.workers,
+            stats=self.stats,
+        )
+        blanks = search.search()
+        if blanks is None:
+            self.moves = -1
+            return
+        self.moves = len(blanks) - 1
+        self.__encode(blanks)
+
+    def __ara_solve(self):
+        """
+        Anytime weighted A*, every improved solution replaces the previous one and
+        is reported to on_solution
+        """
+        search = araStar.ARAStar(
+            self.board,
+            lambda board: heuristic_distance(board, self.heuristic),
+            self.stats,
+            self.weight,
+            on_expand=self.on_expand,
+            on_generate=self.on_generate,
+        )
+        self.moves = -1
+        for blanks, bound in search.search(self.time_budget):
+            self.moves = len(blanks) - 1
+            self.suboptimality = bound
+            self.__encode(blanks)
+            if self.on_solution is not None:
+                self.on_solution(self.moves, bound)
+
+    def __ida_solve(self):
+        """
+        Iterative deepening A*. A depth first search explores the game tree up to
+        a threshold on f = g + h, when the goal is not found the threshold grows to
+        the smallest f that exceeded it. The moves are applied in place on a single
+        PackedBoard and undone on the way back, so only the current path is kept
+        """
+        cursor = PackedBoard(self.board.blocks(), self.board.goal_blocks())
+        path: list[int] = []  # positions visited by the blank tile
+        self.__distance = heuristic_distance
+        if self.timing:
+            self.__distance = self.stats.timed(heuristic_distance, "heuristic_time")
+        threshold = heuristic_distance(cursor, self.heuristic)
+        # with a checkpoint file each level of the path keeps the smallest f over
+        # the threshold of its branches already searched (None means no saves)
+        self.__minima = None if self.checkpoint is None else []
+        self.__next_save = perf_counter() + self.checkpoint_every
+        self.__replay = None
+        if self.__saved is not None:
+            # go down the saved path again, skipping the branches already searched
+            threshold = self.__saved.threshold
+            self.__replay = (self.__saved.stack, self.__saved.minima)
+            self.__saved = None
+        while True:
+            bound = self.__ida_search(cursor, 0, threshold, -1, path)
+            if bound == _FOUND:
+                break
+            if bound == inf:
+                self.moves = -1  # no board within any threshold reaches the goal
+                return
+            threshold = bound
+
+        # the positions visited by the blank tile are stored as moves, the boards
+        # are replayed on demand in the representation given by the user
+        self.moves = len(path)
+        self.__encode([self.board.linear_board.index(0)] + path)
+
+    def __ida_search(
+        self,
+        cursor: PackedBoard,
+        g: int,
+        threshold: int,
+        previous: int,
+        path: list[int],
+    ):
+        """
+        Depth first search bounded by the threshold, return _FOUND when the goal is
+        reached or the smallest f that exceeded the threshold
+        """
+        f = g + self.__distance(cursor, self.heuristic)
+        if f > threshold:
+            return f
+        if cursor.is_goal():
+            return _FOUND
+        minimum = inf
+        blank = cursor.blank
+        stats = self.stats
+        stats.expanded += 1
+        stats.layers[f] = stats.layers.get(f, 0) + 1
+        if g + 1 > stats.max_open:
+            stats.max_open = g + 1
+        if self.on_expand is not None:
+            self.on_expand(cursor, g)
+        moves = cursor.tables.moves[blank]
+        if self.__replay is not None:
+            stack, minima = self.__replay
+            if g < len(stack):
+                moves = moves[moves.index(stack[g]) :]
+                minimum = minima[g]
+            else:
+                self.__replay = None  # deepest saved level, searched from scratch
+        minima = self.__minima
+        if minima is not None:
+            del minima[g:]
+            minima.append(minimum)
+            if stats.expanded & 1023 == 0 and perf_counter() >= self.__next_save:
+                IDAStarCheckpoint(
+                    *self.__header(), threshold, list(path), minima[:g]
+                ).save(self.checkpoint)
+                self.__next_save = perf_counter() + self.checkpoint_every
+        for idx in moves:
+            if idx == previous:
+                stats.duplicates += 1
+                continue  # moving the blank tile back only undoes the last move
+            if self.timing:
+                start = perf_counter()
+                cursor.slide(idx)
+                stats.neighbors_time += perf_counter() - start
+            else:
+                cursor.slide(idx)
+            path.append(idx)
+            stats.generated += 1
+            if self.on_generate is not None:
+                self.on_generate(cursor, g + 1)
+            bound = self.__ida_search(cursor, g + 1, threshold, blank, path)
+            if bound == _FOUND:
+                return _FOUND
+            path.pop()
+            cursor.slide(blank)
+            if bound < minimum:
+                minimum = bound
+                if minima is not None:
+                    minima[g] = minimum
+        return minimum
 
     # not all puzzles have solution, this method tell us before hand if a board is solvable
     def isSolvable(self):
-        """To be implemented"""
-        pass
+        """True if the board has a solution, otherwise number_of_moves() is -1"""
+        return self.solvable
 
     def __iter__(self):
         """
-        Define a way to iterate on the solver
+        Define a way to iterate on the solver, the boards from the initial board to
+        the goal are rebuilt from the stored moves, so the solver can be iterated
+        any number of times
         """
-        while len(self.solutions) > 0:
-            yield self.solutions.pop()
+        if self.moves < 0:
+            return
+        board = self.board
+        yield board
+        for move in self.path.decode("ascii"):
+            board = board.moved(move)
+            yield board
+
+    def solution_moves(self) -> str:
+        """Moves of the blank tile (U, D, L or R) from the initial board to the goal"""
+        return self.path.decode("ascii")
 
     def number_of_moves(self):
-        return self.moves - 1
+        return self.moves
+
+    def bound(self) -> float:
+        """The solution has at most bound() times the minimum number of moves"""
+        return self.suboptimality
 
     # @functools.total_ordering
     class aStar(object):
@@ -220,20 +1045,27 @@ class Solver(object):
         the priorities based on this computations
         """
 
-        def __init__(self, BoardNode: BoardNode, heuristic: HeuristicDistance):
+        def __init__(
+            self, BoardNode: BoardNode, heuristic: HeuristicDistance, weight=1.0
+        ):
             self.BoardNode = BoardNode
             self.heuristic_distance = self.getHeuristicDistance(
                 heuristic
             )  # can be replace with the hamming distance
             self.state = self.BoardNode.state
-            self.cost_function = self.heuristic_distance + self.BoardNode.state
+            if weight == 1:
+                self.cost_function = self.heuristic_distance + self.BoardNode.state
+            elif weight == inf:
+                self.cost_function = self.heuristic_distance  # greedy best first
+            else:
+                # rounded down so the bucket queue gets integers, the goal still
+                # comes out with at most weight times the minimum number of moves
+                self.cost_function = int(
+                    self.BoardNode.state + weight * self.heuristic_distance
+                )
 
         def getHeuristicDistance(self, heuristic: HeuristicDistance):
-            match heuristic:
-                case heuristic.MANHATTAN:
-                    return self.BoardNode.current.manhattan()
-                case heuristic.HAMMING:
-                    return self.BoardNode.current.hamming()
+            return heuristic_distance(self.BoardNode.current, heuristic)
 
         def get_Board_Node(self):
             return self.BoardNode
@@ -252,17 +1084,16 @@ class Solver(object):
 
 
 if __name__ == "__main__":
-    # Uncomment to create the game board game from a random generator
-    # n = 3   # size of the board
-    # a = list(random.sample(range(n*n),n*n))
-    # blocks = [[a[n*i+j] for j in range(n)] for i in range(n) ]
+    # Uncomment to create a random solvable board of about 20 moves (see
+    # generator.py to control its number of moves or to create many boards)
+    # import generator
+    # blocks = generator.random_walk(3, 20, random.Random())
 
-    # Uncomment to create the board game reading from a file
+    # Uncomment to create the board game reading from a file (see loader.py to
+    # read many boards from one or more files)
     data_folder = Path("source_data/")
     file_to_open = data_folder / "puzzle04.txt"
-    f = open(file_to_open)
-    z = int(f.readline())
-    blocks = [[int(el) for el in line.split()] for line in f]
+    blocks = loader.read_blocks(str(file_to_open))
 
     board = Board(blocks)
     # print("initial board")
@@ -271,6 +1102,9 @@ if __name__ == "__main__":
     solver = Solver(board, HeuristicDistance.MANHATTAN)
 
     # Check if the board is solvable and if so, show how to solve it
-    print("# of move to solve the board: " + str(solver.number_of_moves()))
-    for solutions in solver:
-        print(solutions)
+    if not solver.isSolvable():
+        print("The board has no solution")
+    else:
+        print("# of move to solve the board: " + str(solver.number_of_moves()))
+        for solutions in solver:
+            print(solutions)
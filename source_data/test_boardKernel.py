@@ -0,0 +1,122 @@
+import importlib
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import board
+import boardKernel
+from loader import load
+from solver import HeuristicDistance, SearchAborted, Solver
+
+# *****************************************************************************
+#  Execution:    python -m pytest source_data/test_boardKernel.py
+#  Dependencies: pytest, a C compiler (the kernel is built when it is missing)
+#
+#  The compiled kernel (_boardKernel.c) and the pure Python code of board.Board
+#  must give the same boards, the same solutions and the same counters for
+#  every solvable board of source_data, and the same errors for bad boards.
+#  The hardest boards would take minutes without the kernel, so every search
+#  stops after NODE_BUDGET expanded boards: up to there both searches must have
+#  expanded and generated the same boards.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+NODE_BUDGET = 20_000
+FOLDER = Path(__file__).resolve().parent
+CORPUS = [
+    record
+    for record in load([str(FOLDER)], strict=False)
+    if record.error is None and record.solvable
+]
+
+
+@pytest.fixture(scope="module")
+def kernel():
+    if board._boardKernel is None:
+        try:
+            boardKernel.build()
+        except (OSError, subprocess.CalledProcessError) as e:
+            pytest.skip(f"the kernel can't be built here ({e})")
+        board._boardKernel = importlib.import_module("_boardKernel")
+    return board._boardKernel
+
+
+def _search(blocks, kernel_module):
+    """Outcome of an A* search with the given kernel (None: pure Python)"""
+    expanded = []
+    saved = board._boardKernel
+    board._boardKernel = kernel_module
+    try:
+        try:
+            solver = Solver(
+                board.Board(blocks),
+                HeuristicDistance.LINEAR_CONFLICT,
+                state_tables=False,
+                node_budget=NODE_BUDGET,
+                on_expand=lambda b, moves: expanded.append(b.key()),
+            )
+            solution = (solver.number_of_moves(), solver.solution_moves())
+            solution += ([str(b) for b in solver],)
+            stats = solver.stats
+        except SearchAborted:
+            solution = None
+            stats = None
+    finally:
+        board._boardKernel = saved
+    counters = None if stats is None else (stats.generated, stats.duplicates)
+    return solution, counters, expanded
+
+
+@pytest.mark.parametrize("record", CORPUS, ids=lambda record: record.name)
+def test_same_search(kernel, record):
+    assert _search(record.blocks, kernel) == _search(record.blocks, None)
+
+
+@pytest.mark.parametrize(
+    "blocks",
+    [
+        [[1, 2], [3, -1]],
+        [[1, 2], [3, 9]],
+        [[1, 2], [3]],
+        [[1, 2, 3], [4, 5, 6]],
+        [[1, "2"], [3, 0]],
+    ],
+)
+def test_same_errors(kernel, blocks):
+    errors = []
+    saved = board._boardKernel
+    for module in (kernel, None):
+        board._boardKernel = module
+        try:
+            with pytest.raises((ValueError, TypeError)) as error:
+                board.Board(blocks)
+        finally:
+            board._boardKernel = saved
+        # the messages of TypeError come from Python itself, they differ
+        message = str(error.value) if error.type is ValueError else ""
+        errors.append((error.type, message))
+    assert errors[0] == errors[1]
+
+
+def test_same_neighbors(kernel):
+    """Every neighbor of every corpus board, with its distances"""
+    saved = board._boardKernel
+    boards = []
+    for module in (kernel, None):
+        board._boardKernel = module
+        try:
+            boards.append(
+                [
+                    (b.linear_board, b.manhattan(), b.hamming(), b.linear_conflict())
+                    for record in CORPUS
+                    for b in board.Board(record.blocks).neighbors()
+                ]
+            )
+        finally:
+            board._boardKernel = saved
+    assert boards[0] == boards[1]
@@ -0,0 +1,200 @@
+import mmap
+import os
+import struct
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from board import MOVES, move_name, move_target
+
+# *****************************************************************************
+#  Execution:    python stateTable.py n
+#  Dependencies: board.py
+#
+#  Complete tables of the small boards (2x2 and 3x3). A breadth first search
+#  backwards from the goal board visits every reachable board (12 for 2x2 and
+#  181,440 for 3x3) and stores, for each one, its number of moves to the goal
+#  and the first move of an optimal solution. Solving a board is then a lookup
+#  per move instead of a search.
+#
+#  The boards are indexed by the rank of their permutation (Lehmer code): the
+#  i-th digit, in factorial base, is the number of tiles after the position i
+#  that are smaller than the tile at i.
+#
+#      tiles 1 0 2  ->  digits 1 0 0  ->  rank 1 * 2! + 0 * 1! + 0 * 0! = 2
+#
+#  Each board takes one byte: the number of moves in the lowest 5 bits and the
+#  move (index in U, D, L, R) in the highest ones, 255 for the unreachable
+#  boards. The table is saved in a binary file that is memory mapped when it is
+#  loaded (362,880 bytes for 3x3).
+#
+#  Example:
+#  python stateTable.py 3
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+MAX_SIZE = 3  # 4x4 boards have 16! / 2 reachable permutations
+_MAGIC = b"NSTB"
+_VERSION = 1
+_UNREACHABLE = 255
+_DISTANCE_BITS = 5
+_DISTANCE_MASK = (1 << _DISTANCE_BITS) - 1
+_MOVE_NAMES = tuple(MOVES)  # U, D, L, R
+
+
+def rank(tiles) -> int:
+    """
+    Rank of the permutation of the tiles (Lehmer code). The digits are computed
+    from the right, a bit mask of the tiles already seen counts the smaller ones
+    """
+    result = 0
+    seen = 0
+    factorial = 1
+    size = len(tiles)
+    for i in range(size - 1, -1, -1):
+        tile = tiles[i]
+        result += (seen & ((1 << tile) - 1)).bit_count() * factorial
+        seen |= 1 << tile
+        factorial *= size - i
+    return result
+
+
+def build_table(n: int) -> bytearray:
+    """Breadth first search from the goal over every reachable board"""
+    if n > MAX_SIZE:
+        raise ValueError(
+            f"state tables are only available up to {MAX_SIZE}x{MAX_SIZE} boards"
+        )
+    cells = n * n
+    size = 1
+    for k in range(2, cells + 1):
+        size *= k
+    table = bytearray([_UNREACHABLE]) * size
+    goal = list(range(1, cells)) + [0]
+    table[rank(goal)] = 0
+    queue = deque([(bytes(goal), cells - 1, 0)])
+    while queue:
+        tiles, blank, distance = queue.popleft()
+        for move in _MOVE_NAMES:
+            try:
+                target = move_target(n, blank, move)
+            except ValueError:
+                continue  # the move takes the blank tile out of the board
+            neighbor = bytearray(tiles)
+            neighbor[blank], neighbor[target] = neighbor[target], 0
+            index = rank(neighbor)
+            if table[index] == _UNREACHABLE:
+                # the neighbor reaches this board moving its blank tile back
+                back = _MOVE_NAMES.index(move_name(n, target, blank))
+                table[index] = (distance + 1) | (back << _DISTANCE_BITS)
+                queue.append((bytes(neighbor), target, distance + 1))
+    return table
+
+
+class StateTable(object):
+    """
+    Number of moves and first optimal move of every board of size n
+    table: one byte per permutation rank (bytearray or memory mapped file)
+    """
+
+    def __init__(self, n: int, table):
+        self.n = n
+        self.table = table
+
+    @classmethod
+    def build(cls, n: int) -> "StateTable":
+        return cls(n, build_table(n))
+
+    def save(self, path):
+        """
+        Save the table: magic (4 bytes), version, n, 2 bytes of padding, table.
+        It is written to a temporary file of the same folder and renamed, so a
+        crash never leaves a partial table behind
+        """
+        path = Path(path)
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temporary, "wb") as f:
+                f.write(_MAGIC + struct.pack("<BBxx", _VERSION, self.n))
+                f.write(self.table)
+            os.replace(temporary, path)
+        except BaseException:
+            temporary.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path) -> "StateTable":
+        """Memory map a file written by save, the table is not copied"""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < 8 or data[:4] != _MAGIC or data[4] != _VERSION:
+            raise ValueError(f"{path} is not a state table file")
+        n = data[5]
+        size = 1
+        for k in range(2, n * n + 1):
+            size *= k
+        if len(data) != 8 + size:
+            raise ValueError(f"{path} is truncated or corrupted")
+        return cls(n, memoryview(data)[8:])
+
+    def distance(self, board) -> Optional[int]:
+        """Minimum number of moves of the board, None when it is unsolvable"""
+        entry = self.table[rank(board.linear_board)]
+        return None if entry == _UNREACHABLE else entry & _DISTANCE_MASK
+
+    def solve(self, board) -> Optional[str]:
+        """Moves of an optimal solution of the board, None when it is unsolvable"""
+        tiles = list(board.linear_board)
+        blank = tiles.index(0)
+        moves = []
+        entry = self.table[rank(tiles)]
+        if entry == _UNREACHABLE:
+            return None
+        while entry & _DISTANCE_MASK != 0:
+            move = _MOVE_NAMES[entry >> _DISTANCE_BITS]
+            target = move_target(self.n, blank, move)
+            tiles[blank], tiles[target] = tiles[target], 0
+            blank = target
+            moves.append(move)
+            entry = self.table[rank(tiles)]
+        return "".join(moves)
+
+
+_tables: dict[int, StateTable] = {}
+
+
+def default_path(n: int) -> Path:
+    return Path(__file__).parent / "source_data" / f"states{n}x{n}.tbl"
+
+
+def for_size(n: int) -> StateTable:
+    """
+    State table used by the solver for boards of size n. It is loaded from its
+    default file, or built and saved there the first time it is required. A
+    file that can't be loaded (e.g. empty or cut) is built again, and when the
+    folder is read only the table is kept in memory only
+    """
+    table = _tables.get(n)
+    if table is None:
+        path = default_path(n)
+        if path.exists():
+            try:
+                table = StateTable.load(path)
+            except (OSError, ValueError):
+                table = None  # rebuilt and saved again below
+        if table is None:
+            table = StateTable.build(n)
+            try:
+                table.save(path)
+            except OSError:
+                pass  # e.g. a read only folder, the next process builds it again
+        _tables[n] = table
+    return table
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1])
+    StateTable.build(n).save(default_path(n))
+    print("state table saved in " + str(default_path(n)))
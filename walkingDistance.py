@@ -0,0 +1,84 @@
+from collections import deque
+
+# *****************************************************************************
+#  Execution:    none
+#  Dependencies: none
+#
+#  Walking distance tables for the n-puzzle game (idea of Ken'ichiro Takahashi)
+#
+#  The board is abstracted as a matrix where the entry (line, k) counts how many
+#  tiles that belong to the goal row k are placed in the row "line". Only the
+#  vertical moves change that matrix: the blank tile exchanges places with a
+#  tile of an adjacent row. A breadth first search from the goal matrix gives
+#  the minimum number of vertical moves for every matrix. The same is done with
+#  the columns for the horizontal moves, and the sum of both is never bigger
+#  than the real number of moves.
+#
+#      board          tiles of goal row:  0  1  2  3
+#    1  2  3  4               row 0:   [  4  0  0  0 ]
+#    5  6  7  8               row 1:   [  0  4  0  0 ]
+#    9 10 11 12               row 2:   [  0  0  4  0 ]
+#   13 14 15  0               row 3:   [  0  0  0  3 ]
+#
+#  Each matrix is packed into an int with 4 bits per entry, so one tile moving
+#  from a line to another is an O(1) update of the key.
+#
+#  @author Eduardo Ch. Colorado
+# ******************************************************************************/
+
+BITS = 4
+MAX_SIZE = 4  # the number of matrices grows too fast for bigger boards
+
+_tables: dict[tuple[int, int], dict[int, int]] = {}
+
+
+def cell(n: int, line: int, goal_line: int) -> int:
+    """Value added to a key by one tile of the goal line placed in the line"""
+    return 1 << (BITS * (line * n + goal_line))
+
+
+def key(n: int, linear_board, goal_line, vertical: bool) -> int:
+    """
+    Key of the matrix of a board, goal_line is the goal row (vertical) or the
+    goal column (horizontal) of every tile
+    """
+    total = 0
+    for idx, tile in enumerate(linear_board):
+        if tile != 0:
+            line = idx // n if vertical else idx % n
+            total += cell(n, line, goal_line[tile])
+    return total
+
+
+def table(n: int, goal_key: int) -> dict[int, int]:
+    """
+    Walking distance of every matrix reachable from the goal matrix, the
+    tables are built once (a few milliseconds for 4x4) and then cached
+    """
+    distances = _tables.get((n, goal_key))
+    if distances is not None:
+        return distances
+    if n > MAX_SIZE:
+        raise ValueError(
+            f"walking distance is only available up to {MAX_SIZE}x{MAX_SIZE} boards"
+        )
+    mask = (1 << BITS) - 1
+    distances = {goal_key: 0}
+    queue = deque([goal_key])
+    while queue:
+        current = queue.popleft()
+        counts = [
+            [(current >> (BITS * (line * n + k))) & mask for k in range(n)]
+            for line in range(n)
+        ]
+        blank = next(line for line in range(n) if sum(counts[line]) == n - 1)
+        for line in (blank - 1, blank + 1):
+            if 0 <= line < n:
+                for k in range(n):
+                    if counts[line][k] > 0:
+                        neighbor = current - cell(n, line, k) + cell(n, blank, k)
+                        if neighbor not in distances:
+                            distances[neighbor] = distances[current] + 1
+                            queue.append(neighbor)
+    _tables[(n, goal_key)] = distances
+    return distances